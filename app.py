@@ -1,14 +1,46 @@
+from collections import deque
 from enum import Enum, auto
-from typing import Any, List, Dict, TypeVar, Generic
+import argparse
 import math
-import random
-import string
-import copy
-import threading
+import time
 import pyray
 import raylib
-import pyttsx3
 from framework_import import *
+from zerth_trial import SHAPES, EMPTY_TRIAL, Stimulus, TrialGenerator, TrialRecord
+from zerth_render import GridGeometry, TextLayout, ThemePalette, TrialTexture
+from zerth_audio import AudioWorker
+from zerth_profiler import Profiler
+from zerth_input import STIMULI_KEY_BINDS, InputCapture, Response, active_bindings
+from zerth_record import SessionRecorder
+from zerth_replay import SessionReplay
+from zerth_schedule import GRID_DURATION_NS
+from zerth_prefetch import TrialPrefetcher
+from zerth_session import Session
+from zerth_server import StationClient, descriptor_to_trial
+from zerth_lobby import BouncePath
+from zerth_startup import StartupTimeline
+from zerth_pacing import FramePacer
+
+def server_address(value: str) -> tuple[str, int]:
+    host, _, port = value.rpartition(":")
+    if not host or not port.isdigit():
+        raise argparse.ArgumentTypeError(f"expected HOST:PORT, got {value!r}")
+    return host, int(port)
+
+
+parser = argparse.ArgumentParser(description="Zerthimous brain training")
+parser.add_argument("--replay", metavar="SESSION_LOG", help="replay a recorded session")
+parser.add_argument(
+    "--server",
+    type=server_address,
+    metavar="HOST:PORT",
+    help="render trials streamed by a session server",
+)
+parser.add_argument("--fps", type=float, default=60.0, help="target frame rate")
+parser.add_argument("--idle-fps", type=float, default=30.0, help="lobby frame rate")
+arguments = parser.parse_args()
+
+startup = StartupTimeline(("window", "first_frame", "interactive", "audio_ready"))
 
 SCREEN_WIDTH = 1200
 SCREEN_HEIGHT = 675
@@ -23,23 +55,30 @@ class GameState(Enum):
 game_state = GameState.LOBBY
 night_mode = True
 
-sound_engine = pyttsx3.init()
-sound_engine.setProperty("rate", 115)
+pyray.init_audio_device()
+audio_worker = AudioWorker(rate=115)
+audio_worker.start()
+startup.mark("audio_device")
+
+PROFILER_TRACE_PATH = "zerthimous_trace.json"
+profiler = Profiler()
+frame_pacer = FramePacer(arguments.fps, arguments.idle_fps)
+paced_state: GameState | None = None
+CONTROL_KEYS = (raylib.KEY_F3, raylib.KEY_F4, raylib.KEY_SPACE, raylib.KEY_SLASH)
+latched_keys: set[int] = set()
+
+
+palette = ThemePalette(
+    night_mode,
+    (pyray.WHITE, pyray.BLACK, pyray.YELLOW, pyray.RED, pyray.GREEN, pyray.BLUE),
+)
 
 
-def map_ranges(a: float, b: float, c: float, d: float, n: float) -> float:
-    return c + ((n - a) / (b - a)) * (d - c)
+text_layout = TextLayout()
 
 
 def color_wrapper(color: pyray.Color) -> pyray.Color:
-    new_color = color
-    if night_mode:
-        if new_color == pyray.BLACK:
-            new_color = pyray.WHITE
-    else:
-        if new_color == pyray.WHITE:
-            new_color = pyray.BLACK
-    return pyray.Color(new_color[0], new_color[1], new_color[2], new_color[3])
+    return palette.resolve(color)
 
 
 def get_theme_color() -> pyray.Color:
@@ -52,19 +91,25 @@ def change_theme() -> None:
     global night_mode
     night_mode = not night_mode
     zerth_ui.is_night_theme = night_mode
+    palette.select(night_mode)
+
+
+settings_interactable = None
 
 
 def toggle_settings_ui() -> None:
     global game_state
+    global settings_interactable
     pyray.draw_text("Settings", 20, 20, 20, color_wrapper(pyray.WHITE))
-    settings_interactable = zerth_ui.Interactable(
-        pyray.Rectangle(
-            20,
-            0,
-            pyray.measure_text("Settings", 20),
-            40,
+    if settings_interactable is None:
+        settings_interactable = zerth_ui.Interactable(
+            pyray.Rectangle(
+                20,
+                0,
+                text_layout.measure("Settings", 20),
+                40,
+            )
         )
-    )
     if settings_interactable.check_boundaries():
         if game_state == GameState.SETTINGS:
             game_state = GameState.LOBBY
@@ -81,220 +126,180 @@ audio_stimuli_active = False
 updated_difficulty = 95
 
 
-def settings_init(is_init: bool) -> None:
-    global settings_frame
-    diagonal_distance = 0.125 * math.sqrt((SCREEN_WIDTH**2) + (SCREEN_HEIGHT**2))
-    leg = diagonal_distance / math.sqrt(2)
-    pyray.draw_rectangle_lines(
-        int(leg),
-        int(leg),
-        SCREEN_WIDTH - int(leg * 2),
-        SCREEN_HEIGHT - int(leg * 2),
-        color_wrapper(pyray.WHITE),
-    )
-    pyray.draw_rectangle_lines(
-        int(leg / 2),
-        int(leg / 2),
-        SCREEN_WIDTH - int(leg),
-        SCREEN_HEIGHT - int(leg),
-        color_wrapper(pyray.WHITE),
-    )
-    offset = pyray.Vector2(leg * 1.25, leg * 1.25)
-    if is_init:
-
-        def enabled_func(name: str, is_enabled: bool) -> None:
-            global shape_stimuli_active
-            global color_stimuli_active
-            global audio_stimuli_active
-            if is_enabled:
-                match name:
-                    case "Shape":
-                        shape_stimuli_active = True
-                    case "Color":
-                        color_stimuli_active = True
-                    case "Audio":
-                        audio_stimuli_active = True
-            else:
-                match name:
-                    case "Shape":
-                        shape_stimuli_active = False
-                    case "Color":
-                        color_stimuli_active = False
-                    case "Audio":
-                        audio_stimuli_active = False
-
-        def text_updated_func(updated_text: str) -> None:
-            global updated_difficulty
-            if updated_text == "":
-                return
-            updated_difficulty = int(updated_text)
-
-        settings_frame = zerth_ui.ScrollingFrame(
-            "Settings",
-            pyray.Rectangle(
-                int(leg),
-                int(leg),
-                SCREEN_WIDTH - int(leg * 2),
-                SCREEN_HEIGHT - int(leg * 2),
-            ),
-        )
-        settings_frame.enabled = True
-        inabstract_stimuli = zerth_ui.OrganizedText(
-            "Inabstract Stimuli", offset.x, offset.y, 20, "Rainbow"
-        )
-        settings_frame.insert_text(inabstract_stimuli)
-        shape_stimuli = zerth_ui.OrganizedText(
-            "Shape:", offset.x, offset.y + 25, 20, "Blue-Purple"
-        )
-        shape_check = zerth_ui.CheckButton(
-            "Shape",
-            pyray.Rectangle(
-                offset.x + pyray.measure_text("Shape:", 25) + 5,
-                offset.y + 25,
-                20,
-                20,
-            ),
-            enabled_func,
-        )
-        settings_frame.insert_text(shape_stimuli)
-        settings_frame.insert_check_button(shape_check)
-        color_stimuli = zerth_ui.OrganizedText(
-            "Color:", offset.x, offset.y + 50, 20, "Blue-Purple"
-        )
-        color_check = zerth_ui.CheckButton(
-            "Color",
-            pyray.Rectangle(
-                offset.x + pyray.measure_text("Shape:", 25) + 5,
-                offset.y + 50,
-                20,
-                20,
-            ),
-            enabled_func,
-        )
-        settings_frame.insert_text(color_stimuli)
-        settings_frame.insert_check_button(color_check)
-        audio_stimuli = zerth_ui.OrganizedText(
-            "Audio:", offset.x, offset.y + 75, 20, "Blue-Purple"
-        )
-        audio_check = zerth_ui.CheckButton(
-            "Audio",
-            pyray.Rectangle(
-                offset.x + pyray.measure_text("Shape:", 25) + 5,
-                offset.y + 75,
-                20,
-                20,
-            ),
-            enabled_func,
-        )
-        settings_frame.insert_text(audio_stimuli)
-        settings_frame.insert_check_button(audio_check)
-        abstract_stimuli = zerth_ui.OrganizedText(
-            "Abstract Stimuli", offset.x + 200, offset.y, 20, "Rainbow"
-        )
-        settings_frame.insert_text(abstract_stimuli)
-        reflection_stimuli = zerth_ui.OrganizedText(
-            "Reflection:", offset.x + 200, offset.y + 25, 20, "Red-Purple"
-        )
-        reflection_check = zerth_ui.CheckButton(
-            "Reflection",
-            pyray.Rectangle(
-                offset.x + 200 + pyray.measure_text("Reflection:", 25) + 5,
-                offset.y + 25,
-                20,
-                20,
-            ),
-            enabled_func,
-        )
-        settings_frame.insert_text(reflection_stimuli)
-        settings_frame.insert_check_button(reflection_check)
-        rotation_stimuli = zerth_ui.OrganizedText(
-            "Rotation:", offset.x + 200, offset.y + 50, 20, "Red-Purple"
-        )
-        rotation_check = zerth_ui.CheckButton(
-            "Rotation",
-            pyray.Rectangle(
-                offset.x + 200 + pyray.measure_text("Reflection:", 25) + 5,
-                offset.y + 50,
-                20,
-                20,
-            ),
-            enabled_func,
-        )
-        settings_frame.insert_text(rotation_stimuli)
-        settings_frame.insert_check_button(rotation_check)
-        difficulty_text = zerth_ui.OrganizedText(
-            "Difficulty[0-100]: ", offset.x, offset.y + 100, 20, "Orange-Yellow"
-        )
-        difficulty_input = zerth_ui.TextInput(
-            "Difficulty",
-            "20",
-            color_wrapper(pyray.WHITE),
-            pyray.Rectangle(
-                offset.x + pyray.measure_text("Difficulty[0-100]: ", 20) + 5,
-                offset.y + 100,
-                100,
-                25,
-            ),
-            text_updated_func,
+SETTINGS_LEG = 0.125 * math.sqrt((SCREEN_WIDTH**2) + (SCREEN_HEIGHT**2)) / math.sqrt(2)
+SETTINGS_FRAME_LINES = (
+    (
+        int(SETTINGS_LEG),
+        int(SETTINGS_LEG),
+        SCREEN_WIDTH - int(SETTINGS_LEG * 2),
+        SCREEN_HEIGHT - int(SETTINGS_LEG * 2),
+    ),
+    (
+        int(SETTINGS_LEG / 2),
+        int(SETTINGS_LEG / 2),
+        SCREEN_WIDTH - int(SETTINGS_LEG),
+        SCREEN_HEIGHT - int(SETTINGS_LEG),
+    ),
+)
+
+
+def draw_settings() -> None:
+    frame_color = color_wrapper(pyray.WHITE)
+    for x, y, width, height in SETTINGS_FRAME_LINES:
+        pyray.draw_rectangle_lines(x, y, width, height, frame_color)
+    if not audio_worker.is_available():
+        pyray.draw_text(
+            "(loading)" if not audio_worker.ready.is_set() else "(unavailable)",
+            int(SETTINGS_LEG * 1.25) + text_layout.measure("Shape:", 25) + 30,
+            int(SETTINGS_LEG * 1.25) + 75,
+            20,
+            frame_color,
         )
-        settings_frame.insert_text(difficulty_text)
-        settings_frame.insert_text_input(difficulty_input)
     toggle_settings_ui()
 
 
-T = TypeVar("T")
-
-
-class StaticQueue(Generic[T]):
-    def __init__(self, capacity: int) -> None:
-        self.capacity = capacity
-        self.is_full = False
-        self.items: list[T] = []
-
-    def enqueue(self, item: T) -> T:
-        if len(self.items) == self.capacity:
-            items_copy = copy.deepcopy(self.items)
-            del items_copy[0]
-            items_copy.append(item)
-            self.items = items_copy
-            return item
-        elif len(self.items) == self.capacity - 1:
-            self.is_full = True
-        self.items.append(item)
-        return item
-
-    def clear(self):
-        self.items = []
-        self.is_full = False
-
-
-class RandomWithPity:
-    def __init__(self, percentage: int, pity: int) -> None:
-        self.seed = random.random() * (10 ** random.randint(0, 6))
-        self.roll_count = 0
-        self.pity_count = 1
-        self.percentage = percentage
-        self.pity = pity or math.inf
-
-    def roll(self) -> bool:
-        self.roll_count += 1
-        if self.pity_count % self.pity == 0:
-            self.pity_count = 1
-            return True
-        spin = random.random() < (self.percentage / 100)
-        if spin:
-            self.pity_count = 1
-        else:
-            self.pity_count += 1
-        return spin
-
-    def continue_sequence(self):
-        random.seed(self.seed)
-        for _ in range(self.roll_count):
-            random.random()
+def settings_init() -> None:
+    global settings_frame
+    leg = SETTINGS_LEG
+    offset = pyray.Vector2(leg * 1.25, leg * 1.25)
 
-    def reset_seed(self):
-        self.seed = random.random() * (10 ** random.randint(0, 6))
+    def enabled_func(name: str, is_enabled: bool) -> None:
+        global shape_stimuli_active
+        global color_stimuli_active
+        global audio_stimuli_active
+        if is_enabled:
+            match name:
+                case "Shape":
+                    shape_stimuli_active = True
+                case "Color":
+                    color_stimuli_active = True
+                case "Audio":
+                    audio_stimuli_active = True
+        else:
+            match name:
+                case "Shape":
+                    shape_stimuli_active = False
+                case "Color":
+                    color_stimuli_active = False
+                case "Audio":
+                    audio_stimuli_active = False
+
+    def text_updated_func(updated_text: str) -> None:
+        global updated_difficulty
+        if updated_text == "":
+            return
+        updated_difficulty = int(updated_text)
+
+    settings_frame = zerth_ui.ScrollingFrame(
+        "Settings",
+        pyray.Rectangle(
+            int(leg),
+            int(leg),
+            SCREEN_WIDTH - int(leg * 2),
+            SCREEN_HEIGHT - int(leg * 2),
+        ),
+    )
+    settings_frame.enabled = True
+    inabstract_stimuli = zerth_ui.OrganizedText(
+        "Inabstract Stimuli", offset.x, offset.y, 20, "Rainbow"
+    )
+    settings_frame.insert_text(inabstract_stimuli)
+    shape_stimuli = zerth_ui.OrganizedText(
+        "Shape:", offset.x, offset.y + 25, 20, "Blue-Purple"
+    )
+    shape_check = zerth_ui.CheckButton(
+        "Shape",
+        pyray.Rectangle(
+            offset.x + text_layout.measure("Shape:", 25) + 5,
+            offset.y + 25,
+            20,
+            20,
+        ),
+        enabled_func,
+    )
+    settings_frame.insert_text(shape_stimuli)
+    settings_frame.insert_check_button(shape_check)
+    color_stimuli = zerth_ui.OrganizedText(
+        "Color:", offset.x, offset.y + 50, 20, "Blue-Purple"
+    )
+    color_check = zerth_ui.CheckButton(
+        "Color",
+        pyray.Rectangle(
+            offset.x + text_layout.measure("Shape:", 25) + 5,
+            offset.y + 50,
+            20,
+            20,
+        ),
+        enabled_func,
+    )
+    settings_frame.insert_text(color_stimuli)
+    settings_frame.insert_check_button(color_check)
+    audio_stimuli = zerth_ui.OrganizedText(
+        "Audio:", offset.x, offset.y + 75, 20, "Blue-Purple"
+    )
+    audio_check = zerth_ui.CheckButton(
+        "Audio",
+        pyray.Rectangle(
+            offset.x + text_layout.measure("Shape:", 25) + 5,
+            offset.y + 75,
+            20,
+            20,
+        ),
+        enabled_func,
+    )
+    settings_frame.insert_text(audio_stimuli)
+    settings_frame.insert_check_button(audio_check)
+    abstract_stimuli = zerth_ui.OrganizedText(
+        "Abstract Stimuli", offset.x + 200, offset.y, 20, "Rainbow"
+    )
+    settings_frame.insert_text(abstract_stimuli)
+    reflection_stimuli = zerth_ui.OrganizedText(
+        "Reflection:", offset.x + 200, offset.y + 25, 20, "Red-Purple"
+    )
+    reflection_check = zerth_ui.CheckButton(
+        "Reflection",
+        pyray.Rectangle(
+            offset.x + 200 + text_layout.measure("Reflection:", 25) + 5,
+            offset.y + 25,
+            20,
+            20,
+        ),
+        enabled_func,
+    )
+    settings_frame.insert_text(reflection_stimuli)
+    settings_frame.insert_check_button(reflection_check)
+    rotation_stimuli = zerth_ui.OrganizedText(
+        "Rotation:", offset.x + 200, offset.y + 50, 20, "Red-Purple"
+    )
+    rotation_check = zerth_ui.CheckButton(
+        "Rotation",
+        pyray.Rectangle(
+            offset.x + 200 + text_layout.measure("Reflection:", 25) + 5,
+            offset.y + 50,
+            20,
+            20,
+        ),
+        enabled_func,
+    )
+    settings_frame.insert_text(rotation_stimuli)
+    settings_frame.insert_check_button(rotation_check)
+    difficulty_text = zerth_ui.OrganizedText(
+        "Difficulty[0-100]: ", offset.x, offset.y + 100, 20, "Orange-Yellow"
+    )
+    difficulty_input = zerth_ui.TextInput(
+        "Difficulty",
+        "20",
+        color_wrapper(pyray.WHITE),
+        pyray.Rectangle(
+            offset.x + text_layout.measure("Difficulty[0-100]: ", 20) + 5,
+            offset.y + 100,
+            100,
+            25,
+        ),
+        text_updated_func,
+    )
+    settings_frame.insert_text(difficulty_text)
+    settings_frame.insert_text_input(difficulty_input)
 
 
 def generate_square(center: pyray.Vector2, color: pyray.Color) -> None:
@@ -317,90 +322,25 @@ def generate_circle_lines(center: pyray.Vector2, color: pyray.Color) -> None:
     pyray.draw_circle(int(center.x), int(center.y + 60), 20, get_theme_color())
 
 
-def draw_grid():
-    left_most = (SCREEN_WIDTH / 2) - 180
-    right_most = (SCREEN_WIDTH / 2) + 180
-    top_most = (SCREEN_HEIGHT / 2) - 180
-    bottom_most = (SCREEN_HEIGHT / 2) + 180
-    for i in range(7):
-        pyray.draw_line(
-            int(left_most),
-            int(top_most + (i * 60)),
-            int(right_most),
-            int(top_most + (i * 60)),
-            color_wrapper(pyray.WHITE),
-        )
-    for j in range(7):
-        pyray.draw_line(
-            int(left_most + (j * 60)),
-            int(top_most),
-            int(left_most + (j * 60)),
-            int(bottom_most),
-            color_wrapper(pyray.WHITE),
-        )
+grid_geometry = GridGeometry()
 
 
-def generate_grid() -> list[list[pyray.Vector2]]:
-    left_most = (SCREEN_WIDTH / 2) - 180
-    right_most = (SCREEN_WIDTH / 2) + 180
-    top_most = (SCREEN_HEIGHT / 2) - 180
-    bottom_most = (SCREEN_HEIGHT / 2) + 180
-    grid = []
-    for i in range(6):
-        grid.append([])
-        for j in range(6):
-            grid[i].append(
-                pyray.Vector2(
-                    int(left_most + (j * 60) + 30), int(top_most + (i * 60) - 30)
-                )
-            )
-    return grid
-
-
-shapes = ["Square", "Circle", "Square_Lines", "Circle_Lines"]
-game_colors = [pyray.RED, pyray.GREEN, pyray.BLUE]
-
-
-def regenerate_random_cell_count(
-    squares_left: int, max_cells_per_row: float, i: int
-) -> int:
-    choice = random.randint(0, min(math.ceil(max_cells_per_row) + 1, 6))
-    average_cells_per_row = (squares_left - choice) / (6 - (i + 1))
-    if average_cells_per_row > max_cells_per_row:
-        return regenerate_random_cell_count(squares_left, max_cells_per_row, i)
-    return choice
-
-
-class TrialCacheTypes(Enum):
-    TRIAL_GRID = auto()
-    SHAPE_MAP = auto()
-    COLOR_MAP = auto()
-    AUDIO_MAP = auto()
-
-
-trial_cache = StaticQueue[Dict[TrialCacheTypes, List[Any]]](3)
-current_trial_grid = []
-current_shape_map = []
-current_color_map = []
-current_audio_map = []
-grid_cooldown = zerth_cooldown.Cooldown("Grid", 3.0)
-appear_cooldown = zerth_cooldown.Cooldown("Appear", 3.0 - 2.0)
+def get_grid_geometry() -> GridGeometry:
+    return grid_geometry.update(pyray.get_screen_width(), pyray.get_screen_height())
 
-random_position_object = RandomWithPity(33, 5)
-random_shape_object = RandomWithPity(33, 3)
-random_color_object = RandomWithPity(33, 5)
-random_audio_object = RandomWithPity(15, 6)
-was_previous_position = False
 
-grid_enabled = True
+def draw_grid():
+    line_color = color_wrapper(pyray.WHITE)
+    for start_x, start_y, end_x, end_y in get_grid_geometry().lines:
+        pyray.draw_line(start_x, start_y, end_x, end_y, line_color)
 
 
-def play_sound_wrapper(word: str) -> None:
-    sound_engine.say(word)
-    sound_engine.runAndWait()
+game_colors = [pyray.RED, pyray.GREEN, pyray.BLUE]
 
 
-last_key = ""
+session: Session | None = None
+trial_prefetcher: TrialPrefetcher | None = None
+onset_pending = False
 
 
 def get_raw_key_bind(serialized: str) -> int:
@@ -425,49 +365,104 @@ def get_raw_key_bind(serialized: str) -> int:
     return 0
 
 
-position_light_up = False
-shape_light_up = False
-color_light_up = False
-audio_light_up = False
+RAW_KEY_CODES = {get_raw_key_bind(key): key for key in STIMULI_KEY_BINDS}
 
 
-def draw_game_buttons() -> None:
-    global position_light_up
-    global shape_light_up
-    global color_light_up
-    global audio_light_up
-    stimuli_display_order = ["Position"]
-    stimuli_key_binds = "asdfghjkl"
+def active_stimuli() -> Stimulus:
+    active = Stimulus.POSITION
     if shape_stimuli_active:
-        stimuli_display_order.append("Shape")
+        active |= Stimulus.SHAPE
     if color_stimuli_active:
-        stimuli_display_order.append("Color")
-    if audio_stimuli_active:
-        stimuli_display_order.append("Audio")
-    for index in range(len(stimuli_display_order)):
-        to_display = stimuli_display_order[index]
-        to_bind = stimuli_key_binds[index]
-        stimuli_text = to_display + "[" + to_bind.upper() + "]"
+        active |= Stimulus.COLOR
+    if audio_stimuli_active and audio_worker.is_available():
+        active |= Stimulus.AUDIO
+    return active
+
+
+def update_pacing() -> None:
+    global paced_state
+    if paced_state == game_state:
+        return
+    if paced_state == GameState.SETTINGS:
+        pyray.disable_event_waiting()
+    if game_state == GameState.SETTINGS:
+        pyray.enable_event_waiting()
+    frame_pacer.set_idle(game_state != GameState.PLAYING)
+    paced_state = game_state
+
+
+def latch_controls() -> None:
+    for key in CONTROL_KEYS:
+        if pyray.is_key_pressed(key):
+            latched_keys.add(key)
+
+
+def control_pressed(key: int) -> bool:
+    return key in latched_keys or pyray.is_key_pressed(key)
+
+
+def pump_input() -> None:
+    pyray.poll_input_events()
+    latch_controls()
+    input_capture.poll()
+
+
+def next_deadline() -> int | None:
+    if session:
+        return session.scheduler.next_deadline()
+    deadlines = []
+    if station and station.connected.is_set():
+        elapsed_ns = station.elapsed_ns()
+        if remote_trials:
+            deadlines.append(remote_trials[0]["onset_ns"])
+        if remote_offset_ns > elapsed_ns:
+            deadlines.append(remote_offset_ns)
+        return station.started_ns + min(deadlines) if deadlines else None
+    if session_replay:
+        elapsed_ns = time.perf_counter_ns() - replay_started_ns
+        if not session_replay.is_finished():
+            timestamp_ns = session_replay.timeline[session_replay.cursor][0]
+            deadlines.append(timestamp_ns - session_replay.start_ns)
+        offset_ns = input_capture.onset_ns - session_replay.start_ns + GRID_DURATION_NS
+        if offset_ns > elapsed_ns:
+            deadlines.append(offset_ns)
+        return replay_started_ns + min(deadlines) if deadlines else None
+    return None
+
+
+def update_startup() -> None:
+    if audio_worker.ready.is_set():
+        startup.mark("audio_ready")
+    if startup.is_complete():
+        startup.reported = True
+        for stage, timestamp in startup.marks.items():
+            profiler.record("startup." + stage, startup.origin, timestamp)
+
+
+def overlay_status() -> list[str]:
+    lines = [frame_pacer.format()]
+    if startup.reported:
+        lines.append(startup.format())
+    if session:
+        lines.append(f"skipped trials {session.scheduler.skipped}")
+    return lines
+
+
+input_capture: InputCapture | None = None
+session_recorder: SessionRecorder | None = None
+session_replay: SessionReplay | None = None
+station: StationClient | None = None
+remote_trials: deque[dict] = deque()
+remote_offset_ns = 0
+station_error: str | None = None
+replay_started_ns = 0
+
+
+def draw_game_buttons() -> None:
+    for index, (to_bind, stimulus) in enumerate(input_capture.bindings.items()):
+        stimuli_text = stimulus.name.capitalize() + "[" + to_bind.upper() + "]"
         display_color = color_wrapper(pyray.WHITE)
-        if pyray.is_key_pressed(get_raw_key_bind(to_bind)):
-            if is_replicate_position and to_display == "Position":
-                position_light_up = True
-                display_color = pyray.GREEN
-            if is_replicate_shape and to_display == "Shape":
-                shape_light_up = True
-                display_color = pyray.GREEN
-            if is_replicate_color and to_display == "Color":
-                color_light_up = True
-                display_color = pyray.GREEN
-            if is_replicate_audio and to_display == "Audio":
-                audio_light_up = True
-                display_color = pyray.GREEN
-        if (
-            (position_light_up and to_display == "Position")
-            or (shape_light_up and to_display == "Shape")
-            or (color_light_up and to_display == "Color")
-            or (audio_light_up and to_display == "Audio")
-        ):
+        if stimulus in input_capture.hits:
             display_color = pyray.GREEN
         pyray.draw_text(
             stimuli_text,
@@ -478,278 +473,245 @@ def draw_game_buttons() -> None:
         )
 
 
-is_replicate_position = False
-is_replicate_shape = False
-is_replicate_color = False
-is_replicate_audio = False
+def draw_trial(trial: TrialRecord) -> None:
+    grid = get_grid_geometry().cell_centers
+    for iteration, (i, j) in enumerate(trial.cells()):
+        color = game_colors[trial.color_codes[iteration]]
+        match SHAPES[trial.shape_codes[iteration]]:
+            case "Square":
+                generate_square(grid[i][j], color)
+            case "Circle":
+                generate_circle(grid[i][j], color)
+            case "Square_Lines":
+                generate_square_lines(grid[i][j], color)
+            case "Circle_Lines":
+                generate_circle_lines(grid[i][j], color)
+    draw_grid()
+
+
+trial_texture = TrialTexture()
 
 
 def game_init() -> None:
-    global current_trial_grid
-    global current_shape_map
-    global current_color_map
-    global current_audio_map
-    global last_key
-
-    global is_replicate_position
-    global is_replicate_shape
-    global is_replicate_color
-    global is_replicate_audio
-    global position_light_up
-    global shape_light_up
-    global color_light_up
-    global audio_light_up
-    global was_previous_position
-    global grid_enabled
-    grid = generate_grid()
-    if grid_cooldown.is_not_enabled():
-        if grid_enabled:
-            is_replicate_position = False
-            is_replicate_shape = False
-            is_replicate_color = False
-            if trial_cache.is_full:
-                if not was_previous_position:
-                    random_position_object.continue_sequence()
-                    is_replicate_position = random_position_object.roll()
-                    if is_replicate_position:
-                        if shape_stimuli_active:
-                            random_shape_object.continue_sequence()
-                            is_replicate_shape = random_shape_object.roll()
-                        if color_stimuli_active:
-                            random_color_object.continue_sequence()
-                            is_replicate_color = random_color_object.roll()
-            actual_number_of_squares = 0
-            if not is_replicate_position:
-                number_of_squares = int(
-                    map_ranges(0, 100, 4, 12, updated_difficulty)
-                ) - random.randint(0, 2)
-                actual_number_of_squares = number_of_squares
-                max_cells_per_row = number_of_squares / 6
-                organization = []
-                squares_left = number_of_squares
-                for i in range(6):
-                    if i == 5:
-                        organization.append(squares_left)
-                        continue
-                    cell_count = regenerate_random_cell_count(
-                        squares_left, max_cells_per_row, i
-                    )
-                    if squares_left - cell_count < 0:
-                        organization.append(squares_left)
-                        squares_left = 0
-                    else:
-                        organization.append(cell_count)
-                        squares_left -= cell_count
-                random.shuffle(organization)
-                current_trial_grid = []
-                for i in range(6):
-                    row = organization[i]
-                    indices = []
-                    six_elements = [i for i in range(6)]
-                    if row > 0:
-                        while len(six_elements) > 0:
-                            random_index = random.randint(0, 5)
-                            if random_index not in indices:
-                                indices.append(random_index)
-                                six_elements.remove(random_index)
-                                if len(indices) == row:
-                                    break
-                    current_trial_grid.append(indices)
-            else:
-                current_trial_grid = trial_cache.items[0][TrialCacheTypes.TRIAL_GRID]
-                actual_number_of_squares = sum([len(i) for i in current_trial_grid])
-            if shape_stimuli_active:
-                if not is_replicate_shape:
-                    original_shapes_size = len(shapes)
-                    current_shape_map = []
-                    for i in range(len(shapes)):
-                        current_shape_map = current_shape_map + [
-                            shapes[i]
-                        ] * math.floor(actual_number_of_squares / original_shapes_size)
-                    remainder = actual_number_of_squares - len(current_shape_map)
-                    if remainder > 0:
-                        for i in range(remainder):
-                            current_shape_map.append(random.choice(shapes))
-                    random.shuffle(current_shape_map)
-                else:
-                    current_shape_map = trial_cache.items[0][TrialCacheTypes.SHAPE_MAP]
-            else:
-                current_shape_map = ["Square"] * actual_number_of_squares
-            if color_stimuli_active:
-                if not is_replicate_color:
-                    original_colors_size = len(game_colors)
-                    current_color_map = []
-                    for i in range(len(game_colors)):
-                        current_color_map = current_color_map + [
-                            game_colors[i]
-                        ] * math.floor(actual_number_of_squares / original_colors_size)
-                    remainder = actual_number_of_squares - len(current_color_map)
-                    if remainder > 0:
-                        for i in range(remainder):
-                            current_color_map.append(random.choice(game_colors))
-                    random.shuffle(current_color_map)
-                else:
-                    current_color_map = trial_cache.items[0][TrialCacheTypes.COLOR_MAP]
-            else:
-                current_color_map = [pyray.RED] * actual_number_of_squares
-            if audio_stimuli_active:
-                current_audio_map = []
-                current_audio_map.append(last_key)
-            trial_cache.enqueue(
-                {
-                    TrialCacheTypes.TRIAL_GRID: copy.deepcopy(current_trial_grid),
-                    TrialCacheTypes.SHAPE_MAP: copy.deepcopy(current_shape_map),
-                    TrialCacheTypes.COLOR_MAP: copy.deepcopy(current_color_map),
-                    TrialCacheTypes.AUDIO_MAP: copy.deepcopy(current_audio_map),
-                }
-            )
-            if was_previous_position:
-                was_previous_position = False
-            else:
-                if is_replicate_position:
-                    was_previous_position = True
-    if grid_enabled:
-        if grid_cooldown.is_not_enabled():
-            grid_enabled = False
-            position_light_up = False
-            shape_light_up = False
-            color_light_up = False
-            audio_light_up = False
-            appear_cooldown.reset()
-        iteration = 0
-        for i in range(6):
-            row = current_trial_grid[i]
-            for j in range(6):
-                if j in row:
-                    match current_shape_map[iteration]:
-                        case "Square":
-                            generate_square(grid[i][j], current_color_map[iteration])
-                        case "Circle":
-                            generate_circle(grid[i][j], current_color_map[iteration])
-                        case "Square_Lines":
-                            generate_square_lines(
-                                grid[i][j], current_color_map[iteration]
-                            )
-                        case "Circle_Lines":
-                            generate_circle_lines(
-                                grid[i][j], current_color_map[iteration]
-                            )
-                    iteration += 1
+    global onset_pending
+    frame = session.step(time.perf_counter_ns())
+    if frame.presented:
+        onset_pending = True
+        if session.current_trial.audio_key:
+            audio_worker.play(session.current_trial.audio_key)
+    trial_texture.draw((frame.trial, night_mode), lambda: draw_trial(frame.trial))
+    draw_game_buttons()
+
+
+def present_trial() -> None:
+    global onset_pending
+    onset_pending = False
+    if station:
+        input_capture.onset_ns = time.perf_counter_ns()
+        station.send(
+            {
+                "type": "presented",
+                "index": input_capture.trial_index,
+                "elapsed_ns": station.elapsed_ns(input_capture.onset_ns),
+            }
+        )
+        return
+    session.confirm_onset()
+    trial_index = session.scheduler.trial_index
+    scheduled_ns = session.scheduler.scheduled_onset(trial_index)
+    profiler.record("onset_error", scheduled_ns, session.capture.onset_ns)
+    session_recorder.record_trial(
+        trial_index,
+        session.current_trial,
+        session.capture.onset_ns,
+        scheduled_ns,
+        session.scheduler.skipped,
+    )
+
+
+def remote_init() -> None:
+    global game_state
+    global onset_pending
+    global remote_offset_ns
+    global station_error
+    if station.error:
+        station_error = station.error
+        game_state = GameState.LOBBY
+        stop_session()
+        return
+    if not station.connected.is_set():
+        text_layout.draw_centered(
+            "Connecting to session server...",
+            25,
+            SCREEN_WIDTH / 2,
+            SCREEN_HEIGHT / 2,
+            color_wrapper(pyray.WHITE),
+        )
+        return
+    for event in station.poll():
+        match event["type"]:
+            case "trial":
+                remote_trials.append(event)
+            case "response":
+                if event["is_hit"] and event["index"] == input_capture.trial_index:
+                    input_capture.hits |= Stimulus(event["stimulus"])
+    elapsed_ns = station.elapsed_ns()
+    while remote_trials and remote_trials[0]["onset_ns"] <= elapsed_ns:
+        descriptor = remote_trials.popleft()
+        input_capture.begin_trial(descriptor_to_trial(descriptor), descriptor["index"])
+        remote_offset_ns = descriptor["offset_ns"]
+        onset_pending = True
+        if descriptor["audio_key"]:
+            audio_worker.play(descriptor["audio_key"])
+    if elapsed_ns < remote_offset_ns:
+        displayed_trial = input_capture.trial
     else:
-        if appear_cooldown.is_not_enabled():
-            grid_cooldown.reset()
-            grid_enabled = True
-            if audio_stimuli_active:
-                random_audio_object.continue_sequence()
-                is_replicate_audio = random_audio_object.roll()
-                if trial_cache.is_full and is_replicate_audio:
-                    last_key = trial_cache.items[0][TrialCacheTypes.AUDIO_MAP][0]
-                    if not last_key:
-                        last_key = random.choice(string.ascii_lowercase)
-                else:
-                    last_key = random.choice(string.ascii_lowercase)
-                playback = threading.Thread(
-                    target=play_sound_wrapper,
-                    args=(last_key),
-                )
-                playback.start()
+        displayed_trial = EMPTY_TRIAL
+    trial_texture.draw(
+        (displayed_trial, night_mode), lambda: draw_trial(displayed_trial)
+    )
     draw_game_buttons()
-    draw_grid()
 
 
-def vector2_is_greater(v1: pyray.Vector2, v2: pyray.Vector2) -> bool:
-    return (v1.x > v2.x) and (v1.y > v2.y)
-
-
-def remove_vector_duplicates(vector_list: list[pyray.Vector2]) -> list[pyray.Vector2]:
-    list_copy = []
-    hash_map = {}
-    for vector in vector_list:
-        if not hash_map.get(vector.x):
-            hash_map[vector.x] = {}
-        if not hash_map[vector.x].get(vector.y):
-            hash_map[vector.x][vector.y] = True
-    for vector in vector_list:
-        if hash_map[vector.x].get(vector.y):
-            list_copy.append(vector)
-            del hash_map[vector.x][vector.y]
-    return list_copy
-
-
-def keep_vector_duplicates(vector_list: list[pyray.Vector2]) -> list[pyray.Vector2]:
-    list_copy = []
-    hash_map = {}
-    for vector in vector_list:
-        if not hash_map.get(vector.x):
-            hash_map[vector.x] = {}
-        if hash_map[vector.x].get(vector.y) is None:
-            hash_map[vector.x][vector.y] = False
-        else:
-            hash_map[vector.x][vector.y] = True
-    for vector in vector_list:
-        if hash_map[vector.x][vector.y]:
-            list_copy.append(vector)
-            hash_map[vector.x][vector.y] = False
-    return list_copy
+def send_response(response: Response) -> None:
+    station.send(
+        {
+            "type": "response",
+            "key": response.key,
+            "elapsed_ns": station.elapsed_ns(response.timestamp_ns),
+        }
+    )
 
 
-def vector_intersection(
-    v1: list[pyray.Vector2], v2: list[pyray.Vector2]
-) -> list[pyray.Vector2]:
-    return keep_vector_duplicates(v1 + v2)
+def replay_init() -> None:
+    elapsed_ns = time.perf_counter_ns() - replay_started_ns
+    for _, trial in session_replay.advance(elapsed_ns, input_capture):
+        if trial.audio_key:
+            audio_worker.play(trial.audio_key)
+    onset_elapsed_ns = input_capture.onset_ns - session_replay.start_ns
+    if elapsed_ns - onset_elapsed_ns < GRID_DURATION_NS:
+        displayed_trial = input_capture.trial
+    else:
+        displayed_trial = EMPTY_TRIAL
+    trial_texture.draw(
+        (displayed_trial, night_mode), lambda: draw_trial(displayed_trial)
+    )
+    draw_game_buttons()
 
 
-def vector3_to_vector2(vector: pyray.Vector3) -> pyray.Vector2:
-    return pyray.Vector2(vector.x, vector.y)
+def start_session() -> None:
+    global session
+    global trial_prefetcher
+    global input_capture
+    global session_recorder
+    global session_replay
+    global station
+    global replay_started_ns
+    global game_state
+    global station_error
+    if arguments.server:
+        station = StationClient(*arguments.server)
+        station.start(difficulty=updated_difficulty, active=int(active_stimuli()))
+        input_capture = InputCapture(
+            active_bindings(active_stimuli()),
+            RAW_KEY_CODES,
+            pyray.get_key_pressed,
+        )
+        input_capture.listeners.append(send_response)
+        return
+    if arguments.replay:
+        try:
+            session_replay = SessionReplay(arguments.replay)
+        except (OSError, ValueError) as error:
+            station_error = str(error)
+            game_state = GameState.LOBBY
+            return
+        input_capture = session_replay.capture()
+        replay_started_ns = time.perf_counter_ns()
+        return
+    active = active_stimuli()
+    trial_generator = TrialGenerator(
+        difficulty=updated_difficulty,
+        shape_active=Stimulus.SHAPE in active,
+        color_active=Stimulus.COLOR in active,
+        audio_active=Stimulus.AUDIO in active,
+    )
+    trial_prefetcher = TrialPrefetcher(trial_generator)
+    trial_prefetcher.start()
+    session = Session(
+        trial_generator,
+        active,
+        trial_prefetcher.next_trial,
+        RAW_KEY_CODES,
+        pyray.get_key_pressed,
+    )
+    input_capture = session.capture
+    session_recorder = SessionRecorder(SessionRecorder.default_path())
+    session_recorder.record_session(**session.settings())
+    input_capture.listeners.append(session_recorder.record_response)
+
+
+def stop_session() -> None:
+    global session
+    global trial_prefetcher
+    global input_capture
+    global session_recorder
+    global session_replay
+    global station
+    global onset_pending
+    onset_pending = False
+    if trial_prefetcher:
+        trial_prefetcher.stop()
+        trial_prefetcher = None
+    session = None
+    input_capture = None
+    session_replay = None
+    if session_recorder:
+        session_recorder.close(wait=False)
+        session_recorder = None
+    if station:
+        station.close()
+        station = None
+        remote_trials.clear()
 
 
 initialization = True
 initialization_text = "Welcome to Zerthimous. This is a brain training app."
 initialization_dialogue = None
 
-settings_initialization = True
 pyray.init_window(SCREEN_WIDTH, SCREEN_HEIGHT, "Zerthimous")
+startup.mark("window")
 camera = pyray.Camera2D(
     (SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2), (SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2), 0, 1
 )
-camera_box = pyray.Rectangle(SCREEN_WIDTH / 2 - 100, SCREEN_HEIGHT / 2 - 100, 200, 200)
-camera_box_edges = {
-    "Top": [
-        pyray.Vector2((SCREEN_WIDTH / 2) - 100, (SCREEN_HEIGHT / 2) - 100),
-        pyray.Vector2((SCREEN_WIDTH / 2) + 100, (SCREEN_HEIGHT / 2) - 100),
-    ],
-    "Bottom": [
-        pyray.Vector2((SCREEN_WIDTH / 2) - 100, (SCREEN_HEIGHT / 2) + 100),
-        pyray.Vector2((SCREEN_WIDTH / 2) + 100, (SCREEN_HEIGHT / 2) + 100),
-    ],
-    "Left": [
-        pyray.Vector2((SCREEN_WIDTH / 2) - 100, (SCREEN_HEIGHT / 2) + 100),
-        pyray.Vector2((SCREEN_WIDTH / 2) - 100, (SCREEN_HEIGHT / 2) - 100),
-    ],
-    "Right": [
-        pyray.Vector2((SCREEN_WIDTH / 2) + 100, (SCREEN_HEIGHT / 2) + 100),
-        pyray.Vector2((SCREEN_WIDTH / 2) + 100, (SCREEN_HEIGHT / 2) - 100),
-    ],
-}
-camera_offset = pyray.Vector2(0, 0)
-last_camera_origin = pyray.Vector2(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
-camera_direction = pyray.Vector2(-0.25, 1)
-camera_speed = 0.05
+camera_path = BouncePath(
+    (SCREEN_WIDTH / 2 - 100, SCREEN_HEIGHT / 2 - 100, 200, 200),
+    (SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2),
+    (-0.25, 1),
+)
+lobby_time = 0.0
 # change_theme()
 while not pyray.window_should_close():
+    frame_start = profiler.begin()
+    if control_pressed(raylib.KEY_F3):
+        profiler.toggle_overlay()
+    if control_pressed(raylib.KEY_F4):
+        profiler.export(PROFILER_TRACE_PATH)
     pyray.begin_drawing()
     pyray.clear_background(get_theme_color())
-    zerth_ui.ScrollingFrame.update()
-    zerth_ui.TextInput.update()
-    zerth_ui.CheckButton.update()
-    zerth_ui.Dialogue.update()
-    if pyray.get_time() > 3:
+    with profiler.scope("ui_update"):
+        zerth_ui.ScrollingFrame.update()
+        zerth_ui.TextInput.update()
+        zerth_ui.CheckButton.update()
+        zerth_ui.Dialogue.update()
+    if startup.has("first_frame"):
         match game_state:
             case GameState.LOBBY:
                 if settings_frame:
                     settings_frame.enabled = False
                 if initialization:
                     initialization = False
+                    startup.mark("interactive")
                     initialization_dialogue = zerth_ui.Dialogue(
                         initialization_text,
                         zerth_ui.clean_color_permutation(
@@ -759,136 +721,44 @@ while not pyray.window_should_close():
                         pyray.Vector2(0, 0),
                         pyray.Vector2(
                             (SCREEN_WIDTH / 2)
-                            - (pyray.measure_text(initialization_text, 20) / 2),
+                            - (text_layout.measure(initialization_text, 20) / 2),
                             (SCREEN_HEIGHT / 6) * 5,
                         ),
                     )
                 elif initialization_dialogue and not initialization_dialogue.enabled:
-                    if pyray.is_key_pressed(raylib.KEY_SPACE):
+                    if control_pressed(raylib.KEY_SPACE):
                         game_state = GameState.PLAYING
+                        station_error = None
+                        start_session()
                     else:
-                        pyray.draw_text(
+                        if station_error:
+                            text_layout.draw_centered(
+                                station_error,
+                                20,
+                                SCREEN_WIDTH / 2,
+                                ((SCREEN_HEIGHT / 6) * 5) + 35,
+                                color_wrapper(pyray.RED),
+                            )
+                        text_layout.draw_centered(
                             "Zerthimous",
-                            int(
-                                SCREEN_WIDTH / 2
-                                - (pyray.measure_text("Zerthimous", 50) / 2)
-                            ),
-                            int((SCREEN_HEIGHT / 8) * 1),
                             50,
+                            SCREEN_WIDTH / 2,
+                            (SCREEN_HEIGHT / 8) * 1,
                             color_wrapper(pyray.YELLOW),
                         )
-                        pyray.draw_text(
+                        text_layout.draw_centered(
                             "Press [Space] to train",
-                            int(
-                                SCREEN_WIDTH / 2
-                                - (pyray.measure_text("Press [Space] to train", 25) / 2)
-                            ),
-                            int((SCREEN_HEIGHT / 6) * 5),
                             25,
+                            SCREEN_WIDTH / 2,
+                            (SCREEN_HEIGHT / 6) * 5,
                             color_wrapper(pyray.YELLOW),
                         )
                         toggle_settings_ui()
+                        lobby_start = profiler.begin()
                         pyray.begin_mode_2d(camera)
-                        camera_speed -= 0.0000075
-                        camera_speed = max(camera_speed, 0.015)
-                        camera_offset = pyray.vector2_add(
-                            camera_offset,
-                            pyray.vector2_scale(
-                                pyray.vector2_normalize(camera_direction), camera_speed
-                            ),
-                        )
-                        new_target = pyray.Vector2(
-                            last_camera_origin.x + camera_offset.x,
-                            last_camera_origin.y + camera_offset.y,
-                        )
-                        horizontal_vertices = []
-                        vertical_vertices = []
-                        if pyray.check_collision_point_rec(new_target, camera_box):
-                            camera.target = new_target
-                        else:
-                            for edge in camera_box_edges.values():
-                                if camera_direction.x < 0:
-                                    for vertex in edge:
-                                        if vertex.x < SCREEN_WIDTH / 2:
-                                            horizontal_vertices.append(vertex)
-                                else:
-                                    for vertex in edge:
-                                        if vertex.x > SCREEN_WIDTH / 2:
-                                            horizontal_vertices.append(vertex)
-                                if camera_direction.y < 0:
-                                    for vertex in edge:
-                                        if vertex.y > SCREEN_HEIGHT / 2:
-                                            vertical_vertices.append(vertex)
-                                else:
-                                    for vertex in edge:
-                                        if vertex.y < SCREEN_HEIGHT / 2:
-                                            vertical_vertices.append(vertex)
-                            vertex_link = vector_intersection(
-                                remove_vector_duplicates(horizontal_vertices),
-                                remove_vector_duplicates(vertical_vertices),
-                            )[0]
-                            potential_edges = {}
-                            for i, edge in camera_box_edges.items():
-                                for vertex in edge:
-                                    if pyray.vector2_equals(vertex, vertex_link):
-                                        potential_edges[i] = edge
-                                        break
-                            for i, edge in potential_edges.copy().items():
-                                complement_height_origin = (
-                                    SCREEN_HEIGHT - last_camera_origin.y
-                                )
-                                complement_height_target = (
-                                    SCREEN_HEIGHT - camera.target.y
-                                )
-                                slope = (
-                                    complement_height_origin - complement_height_target
-                                ) / (last_camera_origin.x - camera.target.x)
-                                y_intercept = complement_height_origin - (
-                                    slope * last_camera_origin.x
-                                )
-                                intersection_x = 0.0
-                                intersection_y = 0.0
-                                if i == "Top" or i == "Bottom":
-                                    intersection_y = edge[0].y
-                                    intersection_x = (1 / slope) * (
-                                        intersection_y - y_intercept
-                                    )
-                                else:
-                                    intersection_x = edge[0].x
-                                    intersection_y = (
-                                        slope * intersection_x
-                                    ) + y_intercept
-                                transformed = pyray.vector2_add(
-                                    pyray.vector2_scale(
-                                        pyray.Vector2(
-                                            (intersection_x) - last_camera_origin.x,
-                                            (SCREEN_HEIGHT - intersection_y)
-                                            - last_camera_origin.y,
-                                        ),
-                                        0.999,
-                                    ),
-                                    last_camera_origin,
-                                )
-                                if pyray.check_collision_point_rec(
-                                    transformed, camera_box
-                                ):
-                                    last_camera_origin = transformed
-                                    camera_offset = pyray.vector2_zero()
-                                    camera_direction = pyray.vector2_normalize(
-                                        vector3_to_vector2(
-                                            pyray.vector3_cross_product(
-                                                pyray.Vector3(
-                                                    -camera_direction.x,
-                                                    -camera_direction.y,
-                                                    0,
-                                                ),
-                                                pyray.Vector3(0, 0, 1),
-                                            )
-                                        )
-                                    )
-                                    camera_speed = 0.05
-                                    break
-                                    # print(camera_direction.x, camera_direction.y)
+                        lobby_time += pyray.get_frame_time()
+                        camera_x, camera_y = camera_path.position(lobby_time)
+                        camera.target = pyray.Vector2(camera_x, camera_y)
                         pyray.rl_push_matrix()
                         pyray.rl_translatef(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2, 0)
                         pyray.rl_rotatef(pyray.get_time() * 0.25 * 45.0, 0, 0, -1)
@@ -910,29 +780,65 @@ while not pyray.window_should_close():
                             )
                         pyray.rl_pop_matrix()
                         pyray.end_mode_2d()
+                        profiler.end("lobby_camera", lobby_start)
             case GameState.SETTINGS:
-                settings_init(settings_initialization)
-                if settings_frame:
+                if settings_frame is None:
+                    settings_init()
+                elif not settings_frame.enabled:
                     settings_frame.enabled = True
-                if settings_initialization:
-                    settings_initialization = False
+                with profiler.scope("settings"):
+                    draw_settings()
             case GameState.PLAYING:
                 if settings_frame:
                     settings_frame.enabled = False
-                if pyray.is_key_pressed(raylib.KEY_SLASH):
+                if control_pressed(raylib.KEY_SLASH):
                     game_state = GameState.LOBBY
-                    is_replicate_position = False
-                    is_replicate_shape = False
-                    is_replicate_color = False
-                    is_replicate_audio = False
-                    position_light_up = False
-                    shape_light_up = False
-                    color_light_up = False
-                    audio_light_up = False
-                    grid_enabled = True
-                    trial_cache = StaticQueue[Dict[TrialCacheTypes, List[Any]]](3)
+                    stop_session()
                 else:
-                    game_init()
-    pyray.end_drawing()
-    zerth_cooldown.Cooldown.update()
+                    with profiler.scope("game_init"):
+                        if session_replay:
+                            replay_init()
+                        elif station:
+                            remote_init()
+                        else:
+                            game_init()
+    profiler.draw_overlay(SCREEN_WIDTH - 330, 10, color_wrapper(pyray.WHITE))
+    if profiler.overlay_enabled:
+        for index, line in enumerate(overlay_status()):
+            pyray.draw_text(
+                line,
+                10,
+                SCREEN_HEIGHT - 24 - (index * 14),
+                12,
+                color_wrapper(pyray.WHITE),
+            )
+    with profiler.scope("end_drawing"):
+        pyray.end_drawing()
+    latched_keys.clear()
+    latch_controls()
+    if onset_pending:
+        present_trial()
+    if not startup.reported:
+        startup.mark("first_frame")
+        update_startup()
+    if input_capture:
+        input_capture.poll()
+    with profiler.scope("cooldown_update"):
+        zerth_cooldown.Cooldown.update()
+    profiler.end("frame", frame_start)
+    update_pacing()
+    with profiler.scope("frame_wait"):
+        frame_pacer.wait(
+            next_deadline(),
+            pump_input if input_capture and game_state == GameState.PLAYING else None,
+        )
+if trial_prefetcher:
+    trial_prefetcher.stop()
+if station:
+    station.close()
+if session_recorder:
+    session_recorder.close()
+trial_texture.unload()
+audio_worker.stop()
+pyray.close_audio_device()
 pyray.close_window()
@@ -0,0 +1,274 @@
+from typing import Callable
+import argparse
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import time
+from zerth_trial import (
+    RandomWithPity,
+    StaticQueue,
+    Stimulus,
+    TrialGenerator,
+    map_ranges,
+    sample_row_composition,
+)
+from zerth_lobby import BouncePath
+from zerth_session import Session
+
+FRAME_NS = 1_000_000_000 // 60
+NOISE_FLOOR_NS = 50
+
+
+def rejection_cell_count(
+    squares_left: int, max_cells_per_row: float, i: int, generator: random.Random
+) -> int:
+    while True:
+        choice = generator.randint(0, min(math.ceil(max_cells_per_row) + 1, 6))
+        if (squares_left - choice) / (6 - (i + 1)) <= max_cells_per_row:
+            return choice
+
+
+def rejection_row_composition(
+    number_of_squares: int, generator: random.Random
+) -> list[int]:
+    max_cells_per_row = number_of_squares / 6
+    organization = []
+    squares_left = number_of_squares
+    for i in range(6):
+        if i == 5:
+            organization.append(squares_left)
+            continue
+        cell_count = rejection_cell_count(
+            squares_left, max_cells_per_row, i, generator
+        )
+        if squares_left - cell_count < 0:
+            organization.append(squares_left)
+            squares_left = 0
+        else:
+            organization.append(cell_count)
+            squares_left -= cell_count
+    return organization
+
+
+def percentile(ordered: list[int], fraction: float) -> int:
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def latency_summary(timings: list[int]) -> dict[str, float]:
+    timings = sorted(timings)
+    return {
+        "mean_ns": statistics.fmean(timings),
+        "median_ns": percentile(timings, 0.5),
+        "spread_ns": percentile(timings, 0.75) - percentile(timings, 0.25),
+        "p99_ns": percentile(timings, 0.99),
+        "p999_ns": percentile(timings, 0.999),
+        "max_ns": timings[-1],
+    }
+
+
+def throughput(operation: Callable[[], object], operations: int, repeats: int) -> dict:
+    rounds = []
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        for _ in range(operations):
+            operation()
+        rounds.append((time.perf_counter_ns() - start) / operations)
+    return {
+        "median_ns": statistics.median(rounds),
+        "min_ns": min(rounds),
+        "spread_ns": max(rounds) - min(rounds),
+    }
+
+
+def per_call(operation: Callable[[], object], samples: int) -> dict:
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter_ns()
+        operation()
+        timings.append(time.perf_counter_ns() - start)
+    return latency_summary(timings)
+
+
+def bench_static_queue(scale: float) -> dict[str, dict]:
+    results = {}
+    for capacity in (3, 10, 100):
+        queue = StaticQueue[int](capacity)
+        for item in range(capacity):
+            queue.enqueue(item)
+        results[f"static_queue.enqueue[capacity={capacity}]"] = throughput(
+            lambda: queue.enqueue(0), int(20000 * scale) or 1, 5
+        )
+    return results
+
+
+def bench_random_with_pity(scale: float) -> dict[str, dict]:
+    results = {}
+    for roll_count in (0, 1000, 100000):
+        pity = RandomWithPity(33, 5, seed=1.0)
+        for _ in range(roll_count):
+            pity.roll()
+        results[f"random_with_pity.roll[roll_count={roll_count}]"] = throughput(
+            pity.roll, int(20000 * scale) or 1, 5
+        )
+    return results
+
+
+def bench_grid_generation(scale: float) -> dict[str, dict]:
+    results = {}
+    for difficulty in (0, 50, 100):
+        generator = TrialGenerator(seed=1.0, difficulty=difficulty)
+        results[f"trial.grid_mask[difficulty={difficulty}]"] = per_call(
+            generator.generate_grid_mask, int(20000 * scale) or 1
+        )
+        generator = TrialGenerator(
+            seed=1.0,
+            difficulty=difficulty,
+            shape_active=True,
+            color_active=True,
+            audio_active=True,
+        )
+        results[f"trial.next_trial[difficulty={difficulty}]"] = per_call(
+            generator.next_trial, int(20000 * scale) or 1
+        )
+    return results
+
+
+def bench_row_composition(scale: float) -> dict[str, dict]:
+    results = {}
+    generator = random.Random(0)
+    for difficulty in range(0, 101, 10):
+        base = int(map_ranges(0, 100, 4, 12, difficulty))
+        for name, sampler in (
+            ("rejection", rejection_row_composition),
+            ("table", sample_row_composition),
+        ):
+            for number_of_squares in range(base - 2, base + 1):
+                sampler(number_of_squares, generator)
+            results[f"row_composition.{name}[difficulty={difficulty}]"] = per_call(
+                lambda: sampler(base - generator.randint(0, 2), generator),
+                int(5000 * scale) or 1,
+            )
+    return results
+
+
+def bench_lobby_camera(scale: float) -> dict[str, dict]:
+    path = BouncePath((500.0, 237.5, 200.0, 200.0), (600.0, 337.5), (-0.25, 1.0))
+    now = [0.0]
+
+    def frame() -> None:
+        now[0] += 1 / 60
+        path.position(now[0])
+
+    return {"lobby.camera_frame": per_call(frame, int(60000 * scale) or 1)}
+
+
+def bench_playing_frame(scale: float) -> dict[str, dict]:
+    now = [0]
+    pending_keys = []
+    session = Session.create(
+        seed=1.0,
+        active=Stimulus.POSITION | Stimulus.SHAPE | Stimulus.COLOR | Stimulus.AUDIO,
+        key_codes={1: "a", 2: "s", 3: "d", 4: "f"},
+        read_key=lambda: pending_keys.pop() if pending_keys else 0,
+        clock=lambda: now[0],
+    )
+    session.start(now[0])
+
+    def frame() -> None:
+        now[0] += FRAME_NS
+        session_frame = session.step(now[0])
+        if session_frame.presented:
+            session.confirm_onset()
+            pending_keys.append(1)
+        session.capture.poll()
+        for _ in session_frame.trial.cells():
+            pass
+
+    return {"playing.frame": per_call(frame, int(60000 * scale) or 1)}
+
+
+BENCHMARKS = {
+    "static_queue": bench_static_queue,
+    "random_with_pity": bench_random_with_pity,
+    "grid_generation": bench_grid_generation,
+    "row_composition": bench_row_composition,
+    "lobby_camera": bench_lobby_camera,
+    "playing_frame": bench_playing_frame,
+}
+
+
+def run_benchmarks(selected: list[str], scale: float) -> dict:
+    results = {}
+    for name in selected:
+        results.update(BENCHMARKS[name](scale))
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "created_at": time.time(),
+        "results": results,
+    }
+
+
+def compare(
+    current: dict,
+    baseline: dict,
+    tolerance: float,
+    noise_floor_ns: float = NOISE_FLOOR_NS,
+) -> list[str]:
+    regressions = []
+    for name, result in current["results"].items():
+        reference = baseline["results"].get(name)
+        if not reference or not reference.get("median_ns"):
+            continue
+        ratio = result["median_ns"] / reference["median_ns"]
+        result["baseline_ratio"] = ratio
+        allowed_ns = max(
+            reference["median_ns"] * tolerance,
+            reference.get("spread_ns", 0) + result.get("spread_ns", 0),
+            noise_floor_ns,
+        )
+        if result["median_ns"] - reference["median_ns"] > allowed_ns:
+            regressions.append(f"{name}: {ratio:.2f}x baseline median")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Zerthimous hot path benchmarks")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=BENCHMARKS)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--baseline", help="compare against a stored results file")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--noise-floor-ns", type=float, default=NOISE_FLOOR_NS)
+    arguments = parser.parse_args()
+    report = run_benchmarks(list(arguments.only), arguments.scale)
+    regressions = []
+    if arguments.baseline and not arguments.save_baseline:
+        with open(arguments.baseline) as baseline_file:
+            regressions = compare(
+                report,
+                json.load(baseline_file),
+                arguments.tolerance,
+                arguments.noise_floor_ns,
+            )
+        report["regressions"] = regressions
+    for name, result in report["results"].items():
+        ratio = result.get("baseline_ratio")
+        print(
+            f"{name:<58} {result['median_ns']:>12.0f} ns"
+            + (f"  p99 {result['p99_ns']:>9} ns" if "p99_ns" in result else "")
+            + (f"  {ratio:.2f}x" if ratio else "")
+        )
+    if arguments.save_baseline and arguments.baseline:
+        with open(arguments.baseline, "w") as baseline_file:
+            json.dump(report, baseline_file, indent=2)
+    if arguments.output:
+        with open(arguments.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+    for regression in regressions:
+        print("REGRESSION", regression, file=sys.stderr)
+    raise SystemExit(1 if regressions else 0)
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from zerth_batch import BatchTrialGenerator, match_rates
+from zerth_trial import Stimulus, TrialGenerator
+
+ALL_ACTIVE = dict(shape_active=True, color_active=True, audio_active=True)
+
+
+def scalar_match_rates(total: int) -> dict[Stimulus, float]:
+    trials = TrialGenerator(seed=7.0, **ALL_ACTIVE).generate(total)
+    return {
+        stimulus: sum(stimulus in trial.replicates for trial in trials) / total
+        for stimulus in (
+            Stimulus.POSITION,
+            Stimulus.SHAPE,
+            Stimulus.COLOR,
+            Stimulus.AUDIO,
+        )
+    }
+
+
+def test_match_rates_agree_with_scalar_generator():
+    total = 20_000
+    batch = match_rates(BatchTrialGenerator(seed=7, **ALL_ACTIVE), total, 4096)
+    scalar = scalar_match_rates(total)
+    for stimulus, rate in scalar.items():
+        assert batch[stimulus] == pytest.approx(rate, abs=0.02)
+
+
+def test_same_seed_generates_same_block():
+    first = BatchTrialGenerator(seed=3, **ALL_ACTIVE).generate(500).records()
+    second = BatchTrialGenerator(seed=3, **ALL_ACTIVE).generate(500).records()
+    assert first == second
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 3, 64, 1000])
+def test_replicate_rules_hold_across_blocks(block_size):
+    n_back = 3
+    generator = BatchTrialGenerator(seed=11, n_back=n_back, **ALL_ACTIVE)
+    trials = [
+        trial
+        for block in generator.blocks(1000, block_size)
+        for trial in block.records()
+    ]
+    assert len(trials) == 1000
+    assert not any(trial.replicates for trial in trials[:n_back])
+    for index, trial in enumerate(trials):
+        cell_count = trial.cell_count()
+        assert len(trial.shape_codes) == cell_count
+        assert len(trial.color_codes) == cell_count
+        if index < n_back:
+            continue
+        previous = trials[index - n_back]
+        if Stimulus.POSITION in trial.replicates:
+            assert trial.grid_mask == previous.grid_mask
+            assert Stimulus.POSITION not in trials[index - 1].replicates
+        else:
+            assert not trial.replicates & (Stimulus.SHAPE | Stimulus.COLOR)
+        if Stimulus.SHAPE in trial.replicates:
+            assert trial.shape_codes == previous.shape_codes
+        if Stimulus.COLOR in trial.replicates:
+            assert trial.color_codes == previous.color_codes
+        if Stimulus.AUDIO in trial.replicates:
+            assert trial.audio_key == previous.audio_key
+
+
+def test_shape_codes_are_balanced():
+    block = BatchTrialGenerator(seed=5, shape_active=True).generate(200)
+    for shapes, occupancy in zip(block.shape_codes, block.occupancy):
+        counts = np.bincount(shapes[occupancy], minlength=4)
+        assert counts.min() >= occupancy.sum() // 4
@@ -0,0 +1,91 @@
+from zerth_input import InputCapture, active_bindings
+from zerth_trial import Stimulus, TrialRecord
+
+KEY_CODES = {65: "a", 83: "s", 68: "d", 81: "q"}
+MATCH = TrialRecord(1, b"\x00", b"\x00", "", Stimulus.POSITION)
+
+
+class FakeKeys:
+    def __init__(self) -> None:
+        self.queued: list[int] = []
+
+    def read_key(self) -> int:
+        return self.queued.pop(0) if self.queued else 0
+
+
+def make_capture(active: Stimulus, clock=lambda: 0) -> tuple[InputCapture, FakeKeys]:
+    keys = FakeKeys()
+    capture = InputCapture(active_bindings(active), KEY_CODES, keys.read_key, clock)
+    return capture, keys
+
+
+def test_latency_is_relative_to_trial_onset():
+    capture, _ = make_capture(Stimulus.POSITION)
+    capture.begin_trial(MATCH, 0, 1_000)
+    response = capture.press("a", 1_450)
+    assert response.timestamp_ns == 1_450
+    assert response.latency_ns == 450
+    assert response.trial_index == 0
+
+
+def test_begin_trial_defaults_onset_to_clock():
+    capture, _ = make_capture(Stimulus.POSITION, clock=lambda: 7_000)
+    capture.begin_trial(MATCH, 3)
+    assert capture.onset_ns == 7_000
+    assert capture.press("a", 7_250).latency_ns == 250
+
+
+def test_keys_map_to_their_bindings():
+    capture, _ = make_capture(Stimulus.POSITION | Stimulus.SHAPE | Stimulus.AUDIO)
+    assert capture.bindings == {
+        "a": Stimulus.POSITION,
+        "s": Stimulus.SHAPE,
+        "d": Stimulus.AUDIO,
+    }
+    capture.begin_trial(MATCH, 0, 0)
+    assert capture.press("s", 10).stimulus == Stimulus.SHAPE
+    assert capture.press("d", 20).stimulus == Stimulus.AUDIO
+    assert capture.responded == Stimulus.SHAPE | Stimulus.AUDIO
+
+
+def test_unbound_keys_and_early_presses_are_ignored():
+    capture, _ = make_capture(Stimulus.POSITION)
+    assert capture.press("a", 10) is None
+    capture.begin_trial(MATCH, 0, 0)
+    assert capture.press("q", 20) is None
+    assert capture.press("s", 30) is None
+    assert capture.responses == []
+
+
+def test_poll_drains_every_queued_key_with_one_timestamp():
+    clock_readings = iter([5_000, 9_000])
+    capture, keys = make_capture(
+        Stimulus.POSITION | Stimulus.SHAPE, clock=lambda: next(clock_readings)
+    )
+    capture.begin_trial(MATCH, 0, 1_000)
+    keys.queued = [65, 81, 83]
+    assert capture.poll() == 2
+    assert keys.queued == []
+    assert [response.key for response in capture.responses] == ["a", "s"]
+    assert {response.latency_ns for response in capture.responses} == {4_000}
+    assert capture.poll() == 0
+
+
+def test_hits_only_include_replicated_stimuli():
+    capture, _ = make_capture(Stimulus.POSITION | Stimulus.SHAPE)
+    capture.begin_trial(MATCH, 0, 0)
+    assert capture.press("a", 10).is_hit
+    assert not capture.press("s", 20).is_hit
+    assert capture.hits == Stimulus.POSITION
+    capture.begin_trial(MATCH, 1, 100)
+    assert capture.hits == Stimulus.NONE
+    assert capture.responded == Stimulus.NONE
+
+
+def test_listeners_receive_responses():
+    capture, _ = make_capture(Stimulus.POSITION)
+    received = []
+    capture.listeners.append(received.append)
+    capture.begin_trial(MATCH, 0, 0)
+    response = capture.press("a", 10)
+    assert received == [response]
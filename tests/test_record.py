@@ -0,0 +1,57 @@
+import json
+import pytest
+from zerth_record import (
+    SessionRecorder,
+    event_to_trial,
+    read_session_log,
+    trial_to_event,
+)
+from zerth_trial import TrialGenerator
+
+
+def test_trial_event_round_trip():
+    generator = TrialGenerator(seed=9.0, shape_active=True, color_active=True)
+    for index, trial in enumerate(generator.generate(20)):
+        event = json.loads(json.dumps(trial_to_event(index, trial, 1000)))
+        assert event_to_trial(event) == trial
+
+
+def test_trial_event_records_onset_error():
+    trial = TrialGenerator(seed=9.0).next_trial()
+    assert "onset_error_ns" not in trial_to_event(0, trial, 1500)
+    event = trial_to_event(0, trial, 1500, 1000, 2)
+    assert event["scheduled_ns"] == 1000
+    assert event["onset_error_ns"] == 500
+    assert event["skipped"] == 2
+
+
+def test_recorder_writes_events_in_order(tmp_path):
+    path = tmp_path / "sessions" / "session.jsonl"
+    recorder = SessionRecorder(str(path), flush_interval=0.01)
+    recorder.record_session(seed=1.0)
+    for index, trial in enumerate(TrialGenerator(seed=1.0).generate(5)):
+        recorder.record_trial(index, trial, index * 1000)
+    recorder.close()
+    events = list(read_session_log(str(path)))
+    assert [event["type"] for event in events] == ["session"] + ["trial"] * 5
+    assert [event["index"] for event in events[1:]] == list(range(5))
+
+
+def test_recorder_refuses_existing_log(tmp_path):
+    path = tmp_path / "session.jsonl"
+    path.write_text("")
+    with pytest.raises(FileExistsError):
+        SessionRecorder(str(path))
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    path = tmp_path / "session.jsonl"
+    path.write_text(
+        json.dumps({"type": "session", "seed": 1.0})
+        + "\n"
+        + json.dumps({"type": "response", "index": 0})
+        + "\n"
+        + '{"type": "trial", "ind'
+    )
+    events = list(read_session_log(str(path)))
+    assert [event["type"] for event in events] == ["session", "response"]
@@ -0,0 +1,67 @@
+import json
+import pytest
+from zerth_record import SessionRecorder
+from zerth_replay import audit_session, replay_session
+from zerth_session import Session
+from zerth_trial import Stimulus
+
+
+def record_session(path: str, trials: int = 40) -> Session:
+    session = Session.create(
+        seed=321.0, active=Stimulus.POSITION | Stimulus.SHAPE | Stimulus.AUDIO
+    )
+    recorder = SessionRecorder(path, flush_interval=0.01)
+    recorder.record_session(**session.settings())
+    session.capture.listeners.append(recorder.record_response)
+    keys = list(session.capture.bindings)
+    session.start(0)
+    for trial_index in range(trials):
+        onset_ns = session.scheduler.scheduled_onset(trial_index)
+        session.step(onset_ns)
+        recorder.record_trial(
+            trial_index, session.current_trial, session.capture.onset_ns, onset_ns
+        )
+        pressed = [keys[trial_index % len(keys)]] if trial_index % 3 else []
+        session.step(onset_ns + 400_000_000, pressed)
+    recorder.close()
+    return session
+
+
+def test_recorded_session_replays_consistently(tmp_path):
+    path = str(tmp_path / "session.jsonl")
+    session = record_session(path)
+    result = replay_session(path)
+    assert result.is_consistent
+    assert result.trials_checked == 40
+    assert result.scores == session.score()
+
+
+def test_replay_flags_tampered_trial(tmp_path):
+    path = tmp_path / "session.jsonl"
+    record_session(str(path))
+    lines = path.read_text().splitlines()
+    for number, line in enumerate(lines):
+        event = json.loads(line)
+        if event["type"] == "trial" and event["index"] == 5:
+            event["grid_mask"] ^= 1
+            lines[number] = json.dumps(event)
+    path.write_text("\n".join(lines) + "\n")
+    assert replay_session(str(path)).mismatched_trials == [5]
+
+
+def test_replay_rejects_multiple_sessions(tmp_path):
+    path = tmp_path / "session.jsonl"
+    record_session(str(path), trials=3)
+    path.write_text(path.read_text() * 2)
+    with pytest.raises(ValueError):
+        replay_session(str(path))
+
+
+def test_log_without_header_is_reported(tmp_path):
+    path = tmp_path / "session.jsonl"
+    path.write_text("")
+    with pytest.raises(ValueError, match="no session header"):
+        replay_session(str(path))
+    result = audit_session(str(path))
+    assert not result.is_consistent
+    assert str(path) in result.error
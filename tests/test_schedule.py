@@ -0,0 +1,69 @@
+from zerth_schedule import TrialScheduler
+
+GRID_NS = 3_000
+BLANK_NS = 1_000
+
+
+def started_scheduler(start_ns: int = 10_000) -> TrialScheduler:
+    scheduler = TrialScheduler(GRID_NS, BLANK_NS, clock=lambda: 0)
+    scheduler.start(start_ns)
+    return scheduler
+
+
+def test_scheduled_onsets_follow_the_period():
+    scheduler = started_scheduler()
+    assert scheduler.scheduled_onset(0) == 11_000
+    assert scheduler.scheduled_offset(0) == 14_000
+    assert scheduler.scheduled_onset(3) == 11_000 + 3 * 4_000
+    assert scheduler.due_index(10_999) == -1
+    assert scheduler.due_index(11_000) == 0
+    assert scheduler.due_index(14_999) == 0
+    assert scheduler.due_index(15_000) == 1
+
+
+def test_update_counts_crossed_and_skipped_trials():
+    scheduler = started_scheduler()
+    assert scheduler.update(10_500) == 0
+    assert scheduler.update(11_000) == 1
+    assert scheduler.trial_index == 0
+    assert scheduler.update(12_000) == 0
+    assert scheduler.update(23_500) == 3
+    assert scheduler.trial_index == 3
+    assert scheduler.skipped == 2
+
+
+def test_next_deadline_alternates_offset_and_onset():
+    scheduler = started_scheduler()
+    assert not scheduler.is_visible(10_500)
+    assert scheduler.next_deadline(10_500) == 11_000
+    scheduler.update(11_200)
+    assert scheduler.is_visible(11_200)
+    assert scheduler.next_deadline(11_200) == 14_000
+    assert not scheduler.is_visible(14_000)
+    assert scheduler.next_deadline(14_000) == 15_000
+
+
+def test_onset_error_measures_presentation_lateness():
+    scheduler = started_scheduler()
+    scheduler.update(11_000)
+    scheduler.present(11_250)
+    assert scheduler.onset_error_ns() == 250
+
+
+def test_start_resets_state():
+    scheduler = started_scheduler()
+    scheduler.update(30_000)
+    scheduler.start(50_000)
+    assert scheduler.trial_index == -1
+    assert scheduler.skipped == 0
+    assert scheduler.scheduled_onset(0) == 51_000
+
+
+def test_trial_missed_past_its_offset_counts_as_skipped():
+    scheduler = started_scheduler()
+    assert scheduler.update(14_500) == 1
+    assert scheduler.skipped == 1
+    assert not scheduler.is_visible(14_500)
+    assert scheduler.next_deadline(14_500) == 15_000
+    assert scheduler.update(15_000) == 1
+    assert scheduler.skipped == 1
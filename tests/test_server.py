@@ -0,0 +1,138 @@
+import asyncio
+import json
+import pytest
+from zerth_server import (
+    ProtocolError,
+    SessionServer,
+    encode,
+    stand_in_client,
+)
+from zerth_trial import Stimulus, TrialGenerator
+
+GRID_NS = 60_000_000
+BLANK_NS = 20_000_000
+
+
+async def with_server(run):
+    server = await SessionServer().serve("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        return await asyncio.wait_for(run(port), 30)
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+def test_stand_in_clients_receive_scores():
+    async def run(port):
+        return await asyncio.gather(
+            *(
+                stand_in_client(
+                    "127.0.0.1",
+                    port,
+                    4,
+                    int(Stimulus.POSITION | Stimulus.AUDIO),
+                    GRID_NS,
+                    BLANK_NS,
+                    press_rate=0.5,
+                    reaction_ms=10.0,
+                )
+                for _ in range(5)
+            )
+        )
+
+    results = asyncio.run(with_server(run))
+    for result in results:
+        assert set(result["scores"]) == {"POSITION", "AUDIO"}
+        position = result["scores"]["POSITION"]
+        assert (
+            position["hits"]
+            + position["misses"]
+            + position["false_alarms"]
+            + position["correct_rejections"]
+            >= 4
+        )
+        assert len(result["onset_lag_ns"]) == 4
+
+
+def test_responses_are_acknowledged_with_hits():
+    trials = 8
+
+    async def run(port):
+        loop = asyncio.get_running_loop()
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(
+            encode(
+                {
+                    "type": "start",
+                    "seed": 4.0,
+                    "trials": trials,
+                    "grid_ns": GRID_NS,
+                    "blank_ns": BLANK_NS,
+                }
+            )
+        )
+        settings = json.loads(await reader.readline())
+        started = loop.time()
+        expected = TrialGenerator(seed=settings["seed"]).generate(trials)
+
+        async def respond(descriptor: dict) -> None:
+            await asyncio.sleep(
+                max(started + descriptor["onset_ns"] / 1e9 - loop.time(), 0)
+            )
+            elapsed_ns = int((loop.time() - started) * 1e9)
+            for event in (
+                {"type": "presented", "index": descriptor["index"]},
+                {"type": "response", "key": "a"},
+            ):
+                writer.write(encode({**event, "elapsed_ns": elapsed_ns}))
+
+        presenting = []
+        replies = []
+        while len(replies) < trials:
+            event = json.loads(await reader.readline())
+            if event["type"] == "trial":
+                presenting.append(asyncio.create_task(respond(event)))
+            elif event["type"] == "response":
+                replies.append(event)
+        writer.close()
+        return expected, replies
+
+    expected, replies = asyncio.run(with_server(run))
+    assert [reply["index"] for reply in replies] == list(range(trials))
+    for trial, reply in zip(expected, replies):
+        assert reply["type"] == "response"
+        assert reply["stimulus"] == int(Stimulus.POSITION)
+        assert reply["is_hit"] == (Stimulus.POSITION in trial.replicates)
+    assert any(reply["is_hit"] for reply in replies)
+
+
+@pytest.mark.parametrize(
+    "lines",
+    [
+        ["[1, 2]"],
+        ['{"type": "start", "n_back": "x"}'],
+        ['{"type": "start"}', '{"type": "response", "key": "a", "elapsed_ns": "x"}'],
+    ],
+)
+def test_malformed_messages_are_protocol_errors(lines):
+    async def run(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write("".join(line + "\n" for line in lines).encode())
+        events = [json.loads(line) async for line in reader]
+        writer.close()
+        return events
+
+    assert asyncio.run(with_server(run))[-1]["type"] == "error"
+
+
+def test_client_timestamps_are_clamped_to_the_server_clock():
+    server = SessionServer()
+    session, lookahead = server.create_session({"trials": 2})
+    server.receive(
+        session, {"type": "presented", "index": 0, "elapsed_ns": 8 * 10**14}, 0
+    )
+    assert session.scheduler.trial_index == -1
+    assert len(lookahead.trials) == 0
+    with pytest.raises(ProtocolError):
+        server.receive(session, {"type": "presented", "elapsed_ns": 1.5}, 0)
@@ -0,0 +1,31 @@
+from zerth_session import Session, simulate_session
+from zerth_trial import EMPTY_TRIAL, Stimulus
+
+
+def test_trial_missed_during_a_stall_is_not_presented():
+    session = Session.create(seed=1.0)
+    session.start(0)
+    frame = session.step(4_500_000_000, ["a"])
+    assert frame.presented is None
+    assert frame.trial == EMPTY_TRIAL
+    assert frame.responses == []
+    assert session.scheduler.skipped == 1
+    assert session.trials == {}
+    frame = session.step(5_000_000_000)
+    assert frame.presented[0] == 1
+    assert session.scheduler.onset_error_ns() == 0
+    assert list(session.trials) == [1]
+
+
+def test_presented_trials_follow_the_generator():
+    session = Session.create(seed=2.0, active=Stimulus.POSITION | Stimulus.SHAPE)
+    expected = Session.create(seed=2.0, active=Stimulus.POSITION | Stimulus.SHAPE)
+    session.start(0)
+    for trial_index in range(10):
+        onset_ns = session.scheduler.scheduled_onset(trial_index)
+        frame = session.step(onset_ns)
+        assert frame.presented == (trial_index, expected.generator.next_trial())
+
+
+def test_simulated_session_is_deterministic():
+    assert simulate_session(5.0, trials=30) == simulate_session(5.0, trials=30)
@@ -0,0 +1,60 @@
+import math
+import pytest
+from zerth_trial import StaticQueue, Stimulus, TrialGenerator, row_compositions
+
+
+def test_same_seed_generates_same_sequence():
+    options = dict(
+        difficulty=80, shape_active=True, color_active=True, audio_active=True
+    )
+    first = TrialGenerator(seed=1234.5, **options).generate(200)
+    second = TrialGenerator(seed=1234.5, **options).generate(200)
+    assert first == second
+
+
+def test_different_seeds_diverge():
+    first = TrialGenerator(seed=1.0).generate(50)
+    assert first != TrialGenerator(seed=2.0).generate(50)
+
+
+def test_position_replicates_repeat_n_back_grid():
+    n_back = 3
+    trials = TrialGenerator(seed=42.0, n_back=n_back).generate(500)
+    assert not any(trial.replicates for trial in trials[:n_back])
+    for index, trial in enumerate(trials):
+        if Stimulus.POSITION in trial.replicates:
+            assert trial.grid_mask == trials[index - n_back].grid_mask
+
+
+def test_static_queue_wraps_around():
+    queue = StaticQueue[int](3)
+    for item in range(5):
+        queue.enqueue(item)
+    assert queue.is_full
+    assert len(queue) == 3
+    assert list(queue) == [2, 3, 4]
+    assert queue[0] == 2
+    assert queue[-1] == 4
+    with pytest.raises(IndexError):
+        queue[3]
+
+
+def test_static_queue_clear():
+    queue = StaticQueue[int](2)
+    queue.enqueue(1)
+    queue.enqueue(2)
+    queue.enqueue(3)
+    queue.clear()
+    assert len(queue) == 0
+    assert list(queue) == []
+    queue.enqueue(4)
+    assert list(queue) == [4]
+
+
+@pytest.mark.parametrize("number_of_squares", range(2, 13))
+def test_row_composition_weights_sum_to_one(number_of_squares):
+    compositions, weights = row_compositions(number_of_squares)
+    assert math.isclose(sum(weights), 1.0)
+    for composition in compositions:
+        assert len(composition) == 6
+        assert sum(composition) == number_of_squares
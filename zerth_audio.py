@@ -0,0 +1,96 @@
+import os
+import queue
+import string
+import tempfile
+import threading
+import pyray
+import pyttsx3
+
+SPEECH_CACHE_DIRECTORY = os.path.join(tempfile.gettempdir(), "zerthimous_speech")
+
+
+class AudioWorker(threading.Thread):
+    def __init__(
+        self,
+        rate: int = 115,
+        cache_directory: str = SPEECH_CACHE_DIRECTORY,
+        queue_size: int = 2,
+    ) -> None:
+        super().__init__(name="AudioWorker", daemon=True)
+        self.rate = rate
+        self.cache_directory = os.path.join(cache_directory, str(rate))
+        self.requests: queue.Queue[str | None] = queue.Queue(queue_size)
+        self.sounds: dict[str, pyray.Sound] = {}
+        self.engine = None
+        self.ready = threading.Event()
+        self.stopping = threading.Event()
+        self.device_lock = threading.Lock()
+
+    def cached_path(self, key: str) -> str:
+        return os.path.join(self.cache_directory, key + ".wav")
+
+    def is_cached(self, key: str) -> bool:
+        path = self.cached_path(key)
+        return os.path.exists(path) and os.path.getsize(path) > 0
+
+    def synthesize(self) -> None:
+        os.makedirs(self.cache_directory, exist_ok=True)
+        missing = [key for key in string.ascii_lowercase if not self.is_cached(key)]
+        for key in missing:
+            self.engine.save_to_file(key, self.cached_path(key))
+        if missing:
+            self.engine.runAndWait()
+        for key in string.ascii_lowercase:
+            if not self.is_cached(key):
+                continue
+            with self.device_lock:
+                if self.stopping.is_set():
+                    return
+                sound = pyray.load_sound(self.cached_path(key))
+                if sound.frameCount > 0:
+                    self.sounds[key] = sound
+
+    def run(self) -> None:
+        try:
+            self.engine = pyttsx3.init()
+            self.engine.setProperty("rate", self.rate)
+            self.synthesize()
+        except Exception:
+            pass
+        finally:
+            self.ready.set()
+        while True:
+            key = self.requests.get()
+            if key is None or self.stopping.is_set():
+                return
+            sound = self.sounds.get(key)
+            if sound is not None:
+                with self.device_lock:
+                    if not self.stopping.is_set():
+                        pyray.play_sound(sound)
+            elif self.engine is not None:
+                self.engine.say(key)
+                self.engine.runAndWait()
+
+    def is_available(self) -> bool:
+        return self.ready.is_set() and (bool(self.sounds) or self.engine is not None)
+
+    def play(self, key: str | None) -> None:
+        while True:
+            try:
+                self.requests.put_nowait(key)
+                return
+            except queue.Full:
+                try:
+                    self.requests.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def stop(self) -> None:
+        self.stopping.set()
+        self.play(None)
+        with self.device_lock:
+            for sound in self.sounds.values():
+                pyray.unload_sound(sound)
+            self.sounds.clear()
+        self.join(timeout=1.0)
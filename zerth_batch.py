@@ -0,0 +1,273 @@
+from dataclasses import dataclass, fields
+from typing import Iterator
+import math
+import string
+import numpy as np
+from zerth_trial import (
+    GRID_SIZE,
+    SHAPES,
+    COLOR_COUNT,
+    Stimulus,
+    TrialRecord,
+    map_ranges,
+    ROW_LAYOUTS,
+    row_compositions,
+)
+
+LETTERS = np.array(list(string.ascii_lowercase))
+ROW_LAYOUT_TABLE = np.array([mask for layouts in ROW_LAYOUTS for mask in layouts])
+ROW_LAYOUT_SIZES = np.array([len(layouts) for layouts in ROW_LAYOUTS])
+ROW_LAYOUT_OFFSETS = np.concatenate(([0], np.cumsum(ROW_LAYOUT_SIZES)[:-1]))
+COLUMN_BITS = np.arange(GRID_SIZE)
+
+
+@dataclass(frozen=True, slots=True)
+class TrialBlock:
+    occupancy: np.ndarray
+    shape_codes: np.ndarray
+    color_codes: np.ndarray
+    audio_keys: np.ndarray
+    replicates: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.replicates)
+
+    def records(self) -> list[TrialRecord]:
+        weights = np.left_shift(
+            np.uint64(1), np.arange(GRID_SIZE * GRID_SIZE, dtype=np.uint64)
+        )
+        flat_occupancy = self.occupancy.reshape(len(self), -1)
+        grid_masks = (flat_occupancy * weights).sum(axis=1, dtype=np.uint64)
+        flat_shapes = self.shape_codes.reshape(len(self), -1)
+        flat_colors = self.color_codes.reshape(len(self), -1)
+        return [
+            TrialRecord(
+                int(grid_masks[t]),
+                flat_shapes[t][flat_occupancy[t]].astype(np.uint8).tobytes(),
+                flat_colors[t][flat_occupancy[t]].astype(np.uint8).tobytes(),
+                str(self.audio_keys[t]),
+                Stimulus(int(self.replicates[t])),
+            )
+            for t in range(len(self))
+        ]
+
+
+class PityStream:
+    def __init__(
+        self, rng: np.random.Generator, percentage: int, pity: int
+    ) -> None:
+        self.rng = rng
+        self.percentage = percentage
+        self.pity = pity or math.inf
+        self.failures = 0
+
+    def peek(self, count: int) -> np.ndarray:
+        natural = self.rng.random(count) < (self.percentage / 100)
+        if self.pity == math.inf:
+            return natural
+        positions = np.arange(count)
+        last_natural = np.maximum.accumulate(
+            np.where(natural, positions, -1 - self.failures)
+        )
+        previous_natural = np.concatenate(([-1 - self.failures], last_natural[:-1]))
+        forced = (positions - previous_natural) % self.pity == 0
+        return natural | forced
+
+    def commit(self, spins: np.ndarray) -> None:
+        hits = np.flatnonzero(spins)
+        if len(hits):
+            self.failures = len(spins) - 1 - int(hits[-1])
+        else:
+            self.failures += len(spins)
+
+    def roll(self, count: int) -> np.ndarray:
+        spins = self.peek(count)
+        self.commit(spins)
+        return spins
+
+
+def resolve_sources(sources: np.ndarray) -> np.ndarray:
+    while True:
+        jumped = sources[sources]
+        if np.array_equal(jumped, sources):
+            return sources
+        sources = jumped
+
+
+class BatchTrialGenerator:
+    def __init__(
+        self,
+        seed: int | None = None,
+        difficulty: int = 95,
+        shape_active: bool = False,
+        color_active: bool = False,
+        audio_active: bool = False,
+        n_back: int = 3,
+    ) -> None:
+        self.rng = np.random.default_rng(seed)
+        self.difficulty = min(max(difficulty, 0), 100)
+        self.shape_active = shape_active
+        self.color_active = color_active
+        self.audio_active = audio_active
+        self.n_back = n_back
+        self.position_stream = PityStream(self.rng, 33, 5)
+        self.shape_stream = PityStream(self.rng, 33, 3)
+        self.color_stream = PityStream(self.rng, 33, 5)
+        self.audio_stream = PityStream(self.rng, 15, 6)
+        self.was_previous_position = False
+        self.trial_count = 0
+        self.tail: TrialBlock | None = None
+
+    def roll_positions(self, count: int) -> np.ndarray:
+        replicates = np.zeros(count, dtype=bool)
+        first = max(
+            self.n_back - self.trial_count, 1 if self.was_previous_position else 0
+        )
+        if first >= count:
+            return replicates
+        spins = self.position_stream.peek(count - first)
+        trial_indices = first + np.arange(len(spins))
+        trial_indices[1:] += np.cumsum(spins[:-1])
+        consumed = trial_indices < count
+        self.position_stream.commit(spins[consumed])
+        replicates[trial_indices[consumed & spins]] = True
+        return replicates
+
+    def generate_occupancy(self, count: int) -> np.ndarray:
+        base = int(map_ranges(0, 100, 4, 12, self.difficulty))
+        number_of_squares = base - self.rng.integers(0, 3, size=count)
+        organization = np.zeros((count, GRID_SIZE), dtype=np.int64)
+        for squares in np.unique(number_of_squares):
+            selected = np.flatnonzero(number_of_squares == squares)
+            compositions, weights = row_compositions(int(squares))
+            cumulative = np.cumsum(weights)
+            picks = np.searchsorted(
+                cumulative, self.rng.random(len(selected)) * cumulative[-1], "right"
+            )
+            organization[selected] = np.array(compositions)[
+                np.minimum(picks, len(compositions) - 1)
+            ]
+        organization = np.take_along_axis(
+            organization, np.argsort(self.rng.random((count, GRID_SIZE)), axis=1), 1
+        )
+        organization = np.minimum(organization, GRID_SIZE)
+        picks = (
+            self.rng.random((count, GRID_SIZE)) * ROW_LAYOUT_SIZES[organization]
+        ).astype(np.int64)
+        row_layouts = ROW_LAYOUT_TABLE[ROW_LAYOUT_OFFSETS[organization] + picks]
+        return ((row_layouts[:, :, None] >> COLUMN_BITS) & 1).astype(bool)
+
+    def generate_codes(self, occupancy: np.ndarray, option_count: int) -> np.ndarray:
+        count = len(occupancy)
+        flat_occupancy = occupancy.reshape(count, -1)
+        cell_counts = flat_occupancy.sum(axis=1)
+        width = max(int(cell_counts.max(initial=0)), 1)
+        slots = np.arange(width)
+        per_option = cell_counts // option_count
+        balanced = slots[None, :] < (per_option * option_count)[:, None]
+        codes = np.where(
+            balanced,
+            slots[None, :] // np.maximum(per_option, 1)[:, None],
+            self.rng.integers(0, option_count, size=(count, width)),
+        )
+        shuffle_keys = np.where(
+            slots[None, :] < cell_counts[:, None],
+            self.rng.random((count, width)),
+            np.inf,
+        )
+        codes = np.take_along_axis(codes, np.argsort(shuffle_keys, axis=1), 1)
+        ordinals = np.cumsum(flat_occupancy, axis=1) - 1
+        placed = np.take_along_axis(codes, np.clip(ordinals, 0, width - 1), 1)
+        placed = np.where(flat_occupancy, placed, -1).astype(np.int8)
+        return placed.reshape(occupancy.shape)
+
+    def sources(self, replicates: np.ndarray) -> np.ndarray:
+        carried = 0 if self.tail is None else len(self.tail)
+        indices = np.arange(carried + len(replicates))
+        sources = indices.copy()
+        sources[carried:] = np.where(
+            replicates, indices[carried:] - self.n_back, indices[carried:]
+        )
+        return resolve_sources(sources)
+
+    def carry(self, field: str, values: np.ndarray) -> np.ndarray:
+        if self.tail is None:
+            return values
+        return np.concatenate((getattr(self.tail, field), values))
+
+    def generate(self, count: int) -> TrialBlock:
+        carried = 0 if self.tail is None else len(self.tail)
+        position_replicates = self.roll_positions(count)
+        shape_replicates = np.zeros(count, dtype=bool)
+        color_replicates = np.zeros(count, dtype=bool)
+        replicated = np.flatnonzero(position_replicates)
+        if self.shape_active:
+            shape_replicates[replicated] = self.shape_stream.roll(len(replicated))
+        if self.color_active:
+            color_replicates[replicated] = self.color_stream.roll(len(replicated))
+        occupancy = self.carry("occupancy", self.generate_occupancy(count))
+        occupancy = occupancy[self.sources(position_replicates)]
+        if self.shape_active:
+            shape_codes = self.generate_codes(occupancy, len(SHAPES))
+        else:
+            shape_codes = np.where(occupancy, 0, -1).astype(np.int8)
+        if carried:
+            shape_codes[:carried] = self.tail.shape_codes
+        shape_codes = shape_codes[self.sources(shape_replicates)]
+        if self.color_active:
+            color_codes = self.generate_codes(occupancy, COLOR_COUNT)
+        else:
+            color_codes = np.where(occupancy, 0, -1).astype(np.int8)
+        if carried:
+            color_codes[:carried] = self.tail.color_codes
+        color_codes = color_codes[self.sources(color_replicates)]
+        audio_replicates = np.zeros(count, dtype=bool)
+        if self.audio_active:
+            audio_replicates = self.audio_stream.roll(count)
+            audio_replicates &= self.trial_count + np.arange(count) >= self.n_back
+            audio_keys = LETTERS[self.rng.integers(0, len(LETTERS), size=count)]
+        else:
+            audio_keys = np.full(count, "", dtype="<U1")
+        audio_keys = self.carry("audio_keys", audio_keys)
+        audio_keys = audio_keys[self.sources(audio_replicates)]
+        replicates = (
+            position_replicates * np.uint8(Stimulus.POSITION)
+            | shape_replicates * np.uint8(Stimulus.SHAPE)
+            | color_replicates * np.uint8(Stimulus.COLOR)
+            | audio_replicates * np.uint8(Stimulus.AUDIO)
+        ).astype(np.uint8)
+        block = TrialBlock(
+            occupancy[carried:],
+            shape_codes[carried:],
+            color_codes[carried:],
+            audio_keys[carried:],
+            replicates,
+        )
+        self.trial_count += count
+        if count:
+            self.was_previous_position = bool(position_replicates[-1])
+        self.tail = TrialBlock(
+            *(
+                self.carry(field.name, getattr(block, field.name))[-self.n_back :]
+                for field in fields(TrialBlock)
+            )
+        )
+        return block
+
+    def blocks(self, total: int, block_size: int = 65536) -> Iterator[TrialBlock]:
+        while total > 0:
+            count = min(total, block_size)
+            total -= count
+            yield self.generate(count)
+
+
+def match_rates(
+    generator: BatchTrialGenerator, total: int, block_size: int = 65536
+) -> dict[Stimulus, float]:
+    counts = dict.fromkeys(
+        (Stimulus.POSITION, Stimulus.SHAPE, Stimulus.COLOR, Stimulus.AUDIO), 0
+    )
+    for block in generator.blocks(total, block_size):
+        for stimulus in counts:
+            counts[stimulus] += int(np.count_nonzero(block.replicates & stimulus))
+    return {stimulus: count / max(total, 1) for stimulus, count in counts.items()}
@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+from typing import Callable
+import time
+from zerth_trial import Stimulus, TrialRecord, EMPTY_TRIAL
+
+STIMULI_DISPLAY_ORDER = (
+    Stimulus.POSITION,
+    Stimulus.SHAPE,
+    Stimulus.COLOR,
+    Stimulus.AUDIO,
+)
+STIMULI_KEY_BINDS = "asdfghjkl"
+
+
+@dataclass(frozen=True, slots=True)
+class Response:
+    trial_index: int
+    stimulus: Stimulus
+    key: str
+    timestamp_ns: int
+    latency_ns: int
+    is_hit: bool
+
+
+def active_bindings(active: Stimulus) -> dict[str, Stimulus]:
+    return dict(
+        zip(
+            STIMULI_KEY_BINDS,
+            (stimulus for stimulus in STIMULI_DISPLAY_ORDER if stimulus in active),
+        )
+    )
+
+
+class InputCapture:
+    def __init__(
+        self,
+        bindings: dict[str, Stimulus],
+        key_codes: dict[int, str],
+        read_key: Callable[[], int],
+        clock: Callable[[], int] = time.perf_counter_ns,
+    ) -> None:
+        self.bindings = bindings
+        self.key_codes = key_codes
+        self.read_key = read_key
+        self.clock = clock
+        self.trial = EMPTY_TRIAL
+        self.trial_index = -1
+        self.onset_ns = 0
+        self.responded = Stimulus.NONE
+        self.hits = Stimulus.NONE
+        self.responses: list[Response] = []
+        self.listeners: list[Callable[[Response], None]] = []
+
+    def begin_trial(
+        self, trial: TrialRecord, trial_index: int, onset_ns: int | None = None
+    ) -> None:
+        self.trial = trial
+        self.trial_index = trial_index
+        self.onset_ns = self.clock() if onset_ns is None else onset_ns
+        self.responded = Stimulus.NONE
+        self.hits = Stimulus.NONE
+
+    def press(self, key: str, timestamp_ns: int) -> Response | None:
+        stimulus = self.bindings.get(key)
+        if stimulus is None or self.trial_index < 0:
+            return None
+        response = Response(
+            self.trial_index,
+            stimulus,
+            key,
+            timestamp_ns,
+            timestamp_ns - self.onset_ns,
+            stimulus in self.trial.replicates,
+        )
+        self.responded |= stimulus
+        if response.is_hit:
+            self.hits |= stimulus
+        self.responses.append(response)
+        for listener in self.listeners:
+            listener(response)
+        return response
+
+    def poll(self) -> int:
+        timestamp_ns = self.clock()
+        captured = 0
+        key_code = self.read_key()
+        while key_code:
+            key = self.key_codes.get(key_code)
+            if key is not None and self.press(key, timestamp_ns) is not None:
+                captured += 1
+            key_code = self.read_key()
+        return captured
@@ -0,0 +1,84 @@
+import math
+
+
+class BouncePath:
+    def __init__(
+        self,
+        bounds: tuple[float, float, float, float],
+        origin: tuple[float, float],
+        direction: tuple[float, float],
+        initial_speed: float = 3.0,
+        deceleration: float = 0.027,
+        minimum_speed: float = 0.9,
+    ) -> None:
+        self.left, self.top, width, height = bounds
+        self.right = self.left + width
+        self.bottom = self.top + height
+        self.initial_speed = initial_speed
+        self.deceleration = deceleration
+        self.minimum_speed = minimum_speed
+        self.slowdown_time = (initial_speed - minimum_speed) / deceleration
+        self.slowdown_distance = self.travelled(self.slowdown_time)
+        self.bounces = 0
+        self.plan(origin, direction, 0.0)
+
+    def travelled(self, elapsed: float) -> float:
+        if elapsed <= self.slowdown_time:
+            return (self.initial_speed - (self.deceleration * elapsed / 2)) * elapsed
+        return self.slowdown_distance + (
+            self.minimum_speed * (elapsed - self.slowdown_time)
+        )
+
+    def time_to_travel(self, distance: float) -> float:
+        if distance <= self.slowdown_distance:
+            discriminant = self.initial_speed**2 - (2 * self.deceleration * distance)
+            return (self.initial_speed - math.sqrt(max(discriminant, 0.0))) / (
+                self.deceleration
+            )
+        return self.slowdown_time + (
+            (distance - self.slowdown_distance) / self.minimum_speed
+        )
+
+    def wall_distance(self) -> float:
+        distances = [math.inf]
+        if self.direction_x > 0:
+            distances.append((self.right - self.origin_x) / self.direction_x)
+        elif self.direction_x < 0:
+            distances.append((self.left - self.origin_x) / self.direction_x)
+        if self.direction_y > 0:
+            distances.append((self.bottom - self.origin_y) / self.direction_y)
+        elif self.direction_y < 0:
+            distances.append((self.top - self.origin_y) / self.direction_y)
+        return max(min(distances), 0.0)
+
+    def plan(
+        self, origin: tuple[float, float], direction: tuple[float, float], now: float
+    ) -> None:
+        length = math.hypot(*direction)
+        self.origin_x = min(max(origin[0], self.left), self.right)
+        self.origin_y = min(max(origin[1], self.top), self.bottom)
+        self.direction_x = direction[0] / length
+        self.direction_y = direction[1] / length
+        self.start_time = now
+        self.hit_distance = self.wall_distance()
+        self.hit_time = now + self.time_to_travel(self.hit_distance)
+
+    def bounce(self) -> None:
+        self.bounces += 1
+        self.plan(
+            (
+                self.origin_x + (self.direction_x * self.hit_distance),
+                self.origin_y + (self.direction_y * self.hit_distance),
+            ),
+            (-self.direction_y, self.direction_x),
+            self.hit_time,
+        )
+
+    def position(self, now: float) -> tuple[float, float]:
+        while now >= self.hit_time:
+            self.bounce()
+        distance = self.travelled(now - self.start_time)
+        return (
+            self.origin_x + (self.direction_x * distance),
+            self.origin_y + (self.direction_y * distance),
+        )
@@ -0,0 +1,89 @@
+from collections import deque
+from typing import Callable
+import time
+
+
+class FramePacer:
+    def __init__(
+        self,
+        target_fps: float = 60.0,
+        idle_fps: float = 30.0,
+        spin_ns: int = 500_000,
+        pump_ns: int = 1_000_000,
+        window: int = 240,
+        clock: Callable[[], int] = time.perf_counter_ns,
+        cpu_clock: Callable[[], int] = time.process_time_ns,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.target_fps = target_fps
+        self.idle_fps = idle_fps
+        self.spin_ns = spin_ns
+        self.pump_ns = pump_ns
+        self.clock = clock
+        self.cpu_clock = cpu_clock
+        self.sleep = sleep
+        self.idle = False
+        self.deadline = clock()
+        self.frames: deque[tuple[int, int, int]] = deque(maxlen=window)
+        self.frames.append((self.deadline, cpu_clock(), 0))
+
+    @property
+    def frame_ns(self) -> int:
+        return int(1e9 / (self.idle_fps if self.idle else self.target_fps))
+
+    def set_idle(self, idle: bool) -> None:
+        if idle != self.idle:
+            self.idle = idle
+            self.deadline = self.clock()
+
+    def wait(
+        self,
+        deadline_ns: int | None = None,
+        pump: Callable[[], object] | None = None,
+    ) -> int:
+        now = self.clock()
+        self.deadline += self.frame_ns
+        if now > self.deadline:
+            self.deadline = now
+        wake = self.deadline
+        if deadline_ns is not None and deadline_ns < wake:
+            wake = max(deadline_ns, now)
+        waited_start = now
+        spin_ns = 0 if self.idle else self.spin_ns
+        remaining = wake - now
+        if pump is None:
+            if remaining > spin_ns:
+                self.sleep((remaining - spin_ns) / 1e9)
+        else:
+            while remaining > spin_ns:
+                self.sleep(min(remaining - spin_ns, self.pump_ns) / 1e9)
+                pump()
+                remaining = wake - self.clock()
+        while spin_ns and self.clock() < wake:
+            pass
+        now = self.clock()
+        if wake < self.deadline:
+            self.deadline = now
+        self.frames.append((now, self.cpu_clock(), now - waited_start))
+        return now - waited_start
+
+    def summary(self) -> dict[str, float]:
+        if len(self.frames) < 2:
+            return {"fps": 0.0, "cpu_percent": 0.0, "wait_percent": 0.0}
+        first_time, first_cpu, _ = self.frames[0]
+        last_time, last_cpu, _ = self.frames[-1]
+        elapsed = max(last_time - first_time, 1)
+        waited = sum(frame[2] for frame in list(self.frames)[1:])
+        return {
+            "fps": (len(self.frames) - 1) * 1e9 / elapsed,
+            "cpu_percent": 100 * (last_cpu - first_cpu) / elapsed,
+            "wait_percent": 100 * waited / elapsed,
+        }
+
+    def format(self) -> str:
+        summary = self.summary()
+        return (
+            f"pacing: {summary['fps']:.1f} fps, cpu {summary['cpu_percent']:.0f}%,"
+            f" waiting {summary['wait_percent']:.0f}%"
+            + (" (idle)" if self.idle else "")
+        )
@@ -0,0 +1,33 @@
+import queue
+import threading
+from zerth_trial import TrialGenerator, TrialRecord
+
+
+class TrialPrefetcher(threading.Thread):
+    def __init__(self, generator: TrialGenerator, lookahead: int = 2) -> None:
+        super().__init__(name="TrialPrefetcher", daemon=True)
+        self.generator = generator
+        self.prefetched: queue.Queue[TrialRecord] = queue.Queue(lookahead)
+        self.stopping = threading.Event()
+        self.misses = 0
+
+    def run(self) -> None:
+        while not self.stopping.is_set():
+            trial = self.generator.next_trial()
+            while not self.stopping.is_set():
+                try:
+                    self.prefetched.put(trial, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    def next_trial(self) -> TrialRecord:
+        try:
+            return self.prefetched.get_nowait()
+        except queue.Empty:
+            self.misses += 1
+            return self.prefetched.get()
+
+    def stop(self) -> None:
+        self.stopping.set()
+        self.join(timeout=1.0)
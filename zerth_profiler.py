@@ -0,0 +1,133 @@
+from collections import deque
+import json
+import os
+import threading
+import time
+
+HISTOGRAM_BUCKETS = 24
+
+
+class StageStats:
+    def __init__(self, window: int) -> None:
+        self.samples: deque[int] = deque(maxlen=window)
+        self.histogram = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, duration: int) -> None:
+        self.samples.append(duration)
+        bucket = min((duration // 1000).bit_length(), HISTOGRAM_BUCKETS - 1)
+        self.histogram[bucket] += 1
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+
+    def summary(self) -> dict[str, float]:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return dict.fromkeys(("count", "mean_ms", "p50_ms", "p99_ms", "max_ms"), 0)
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count / 1e6,
+            "p50_ms": ordered[len(ordered) // 2] / 1e6,
+            "p99_ms": ordered[min(int(len(ordered) * 0.99), len(ordered) - 1)] / 1e6,
+            "max_ms": self.max / 1e6,
+        }
+
+
+class Scope:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: "Profiler", name: str) -> None:
+        self.profiler = profiler
+        self.name = name
+        self.start = 0
+
+    def __enter__(self) -> "Scope":
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.profiler.record(self.name, self.start, time.perf_counter_ns())
+
+
+class Profiler:
+    def __init__(self, window: int = 4096, trace_capacity: int = 65536) -> None:
+        self.window = window
+        self.stages: dict[str, StageStats] = {}
+        self.trace: deque[tuple[str, int, int, int]] = deque(maxlen=trace_capacity)
+        self.origin = time.perf_counter_ns()
+        self.overlay_enabled = False
+        self.overlay_lines: list[str] = []
+        self.overlay_refreshed = 0
+
+    def scope(self, name: str) -> Scope:
+        return Scope(self, name)
+
+    def begin(self) -> int:
+        return time.perf_counter_ns()
+
+    def end(self, name: str, start: int) -> None:
+        self.record(name, start, time.perf_counter_ns())
+
+    def record(self, name: str, start: int, stop: int) -> None:
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats(self.window)
+        stats.add(stop - start)
+        self.trace.append((name, start, stop, threading.get_ident()))
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        return {name: stats.summary() for name, stats in self.stages.items()}
+
+    def chrome_trace(self) -> dict:
+        return {
+            "traceEvents": [
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": (start - self.origin) / 1000,
+                    "dur": (stop - start) / 1000,
+                    "pid": os.getpid(),
+                    "tid": thread,
+                }
+                for name, start, stop, thread in self.trace
+            ],
+            "displayTimeUnit": "ms",
+            "stages": self.summary(),
+            "histograms": {
+                name: {
+                    "bucket_upper_us": [1 << i for i in range(HISTOGRAM_BUCKETS)],
+                    "counts": stats.histogram,
+                }
+                for name, stats in self.stages.items()
+            },
+        }
+
+    def export(self, path: str) -> str:
+        with open(path, "w") as trace_file:
+            json.dump(self.chrome_trace(), trace_file)
+        return path
+
+    def toggle_overlay(self) -> None:
+        self.overlay_enabled = not self.overlay_enabled
+
+    def draw_overlay(
+        self, x: int, y: int, color, refresh_interval: float = 0.5
+    ) -> None:
+        import pyray
+
+        if not self.overlay_enabled:
+            return
+        now = time.perf_counter_ns()
+        if now - self.overlay_refreshed > refresh_interval * 1e9:
+            self.overlay_refreshed = now
+            self.overlay_lines = [
+                f"{name:<14} p50 {stats['p50_ms']:6.2f}  p99 {stats['p99_ms']:6.2f}"
+                f"  max {stats['max_ms']:6.2f} ms"
+                for name, stats in self.summary().items()
+                if stats["count"]
+            ]
+        for index, line in enumerate(self.overlay_lines):
+            pyray.draw_text(line, x, y + (index * 14), 12, color)
@@ -0,0 +1,145 @@
+from typing import Any, Iterator
+import json
+import os
+import queue
+import threading
+import time
+from zerth_trial import Stimulus, TrialRecord
+from zerth_input import Response
+
+SESSION_LOG_DIRECTORY = "sessions"
+
+
+def trial_to_event(
+    trial_index: int,
+    trial: TrialRecord,
+    onset_ns: int,
+    scheduled_ns: int | None = None,
+    skipped: int = 0,
+) -> dict:
+    event = {
+        "type": "trial",
+        "index": trial_index,
+        "grid_mask": trial.grid_mask,
+        "shape_codes": trial.shape_codes.hex(),
+        "color_codes": trial.color_codes.hex(),
+        "audio_key": trial.audio_key,
+        "replicates": int(trial.replicates),
+        "onset_ns": onset_ns,
+    }
+    if scheduled_ns is not None:
+        event["scheduled_ns"] = scheduled_ns
+        event["onset_error_ns"] = onset_ns - scheduled_ns
+        event["skipped"] = skipped
+    return event
+
+
+def event_to_trial(event: dict) -> TrialRecord:
+    return TrialRecord(
+        event["grid_mask"],
+        bytes.fromhex(event["shape_codes"]),
+        bytes.fromhex(event["color_codes"]),
+        event["audio_key"],
+        Stimulus(event["replicates"]),
+    )
+
+
+def response_to_event(response: Response) -> dict:
+    return {
+        "type": "response",
+        "index": response.trial_index,
+        "stimulus": int(response.stimulus),
+        "key": response.key,
+        "timestamp_ns": response.timestamp_ns,
+        "latency_ns": response.latency_ns,
+        "is_hit": response.is_hit,
+    }
+
+
+def read_session_log(path: str) -> Iterator[dict]:
+    with open(path, "r", encoding="utf-8") as log_file:
+        for line in log_file:
+            if not line.endswith("\n"):
+                return
+            yield json.loads(line)
+
+
+class SessionRecorder:
+    def __init__(
+        self,
+        path: str,
+        flush_interval: float = 0.25,
+        fsync_interval: float = 5.0,
+    ) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.pending: queue.SimpleQueue[dict] = queue.SimpleQueue()
+        self.closing = threading.Event()
+        self.log_file = open(path, "x", encoding="utf-8")
+        self.written = 0
+        self.last_fsync = time.monotonic()
+        self.flusher = threading.Thread(
+            target=self.run, name="SessionRecorder", daemon=True
+        )
+        self.flusher.start()
+
+    @staticmethod
+    def default_path() -> str:
+        now_ns = time.time_ns()
+        return os.path.join(
+            SESSION_LOG_DIRECTORY,
+            time.strftime("zerthimous-%Y%m%d-%H%M%S", time.localtime(now_ns / 1e9))
+            + f"-{now_ns % 1_000_000_000:09d}.jsonl",
+        )
+
+    def write(self, event: dict[str, Any]) -> None:
+        self.pending.put(event)
+
+    def record_session(self, **settings: Any) -> None:
+        self.write({"type": "session", "started_at": time.time(), **settings})
+
+    def record_trial(
+        self,
+        trial_index: int,
+        trial: TrialRecord,
+        onset_ns: int,
+        scheduled_ns: int | None = None,
+        skipped: int = 0,
+    ) -> None:
+        self.write(
+            trial_to_event(trial_index, trial, onset_ns, scheduled_ns, skipped)
+        )
+
+    def record_response(self, response: Response) -> None:
+        self.write(response_to_event(response))
+
+    def drain(self) -> None:
+        lines = []
+        while True:
+            try:
+                lines.append(json.dumps(self.pending.get_nowait()))
+            except queue.Empty:
+                break
+        if lines:
+            self.log_file.write("\n".join(lines) + "\n")
+            self.log_file.flush()
+            self.written += len(lines)
+        if time.monotonic() - self.last_fsync >= self.fsync_interval:
+            os.fsync(self.log_file.fileno())
+            self.last_fsync = time.monotonic()
+
+    def run(self) -> None:
+        while not self.closing.wait(self.flush_interval):
+            self.drain()
+        self.drain()
+        os.fsync(self.log_file.fileno())
+        self.log_file.close()
+
+    def close(self, wait: bool = True) -> None:
+        self.closing.set()
+        if wait:
+            self.flusher.join()
@@ -0,0 +1,158 @@
+from typing import Callable, Hashable
+import pyray
+from zerth_trial import GRID_SIZE
+
+CELL_SIZE = 60
+
+
+class GridGeometry:
+    def __init__(self) -> None:
+        self.screen_size: tuple[int, int] | None = None
+        self.cell_centers: list[list[pyray.Vector2]] = []
+        self.lines: list[tuple[int, int, int, int]] = []
+
+    def update(self, screen_width: int, screen_height: int) -> "GridGeometry":
+        if self.screen_size == (screen_width, screen_height):
+            return self
+        self.screen_size = (screen_width, screen_height)
+        half_extent = (GRID_SIZE * CELL_SIZE) / 2
+        left_most = (screen_width / 2) - half_extent
+        right_most = (screen_width / 2) + half_extent
+        top_most = (screen_height / 2) - half_extent
+        bottom_most = (screen_height / 2) + half_extent
+        self.cell_centers = [
+            [
+                pyray.Vector2(
+                    int(left_most + (j * CELL_SIZE) + (CELL_SIZE / 2)),
+                    int(top_most + (i * CELL_SIZE) - (CELL_SIZE / 2)),
+                )
+                for j in range(GRID_SIZE)
+            ]
+            for i in range(GRID_SIZE)
+        ]
+        self.lines = [
+            (
+                int(left_most),
+                int(top_most + (i * CELL_SIZE)),
+                int(right_most),
+                int(top_most + (i * CELL_SIZE)),
+            )
+            for i in range(GRID_SIZE + 1)
+        ] + [
+            (
+                int(left_most + (j * CELL_SIZE)),
+                int(top_most),
+                int(left_most + (j * CELL_SIZE)),
+                int(bottom_most),
+            )
+            for j in range(GRID_SIZE + 1)
+        ]
+        return self
+
+
+class TrialTexture:
+    def __init__(self) -> None:
+        self.target: pyray.RenderTexture | None = None
+        self.key: Hashable = None
+
+    def unload(self) -> None:
+        if self.target is not None:
+            pyray.unload_render_texture(self.target)
+        self.target = None
+        self.key = None
+
+    def draw(self, key: Hashable, render: Callable[[], None]) -> None:
+        screen_width = pyray.get_screen_width()
+        screen_height = pyray.get_screen_height()
+        if self.target is None or (
+            self.target.texture.width != screen_width
+            or self.target.texture.height != screen_height
+        ):
+            self.unload()
+            self.target = pyray.load_render_texture(screen_width, screen_height)
+        if key != self.key:
+            pyray.begin_texture_mode(self.target)
+            pyray.clear_background(pyray.BLANK)
+            render()
+            pyray.end_texture_mode()
+            self.key = key
+        pyray.draw_texture_rec(
+            self.target.texture,
+            pyray.Rectangle(0, 0, screen_width, -screen_height),
+            pyray.Vector2(0, 0),
+            pyray.WHITE,
+        )
+
+
+def theme_color(color: pyray.Color, night_mode: bool) -> pyray.Color:
+    new_color = color
+    if night_mode:
+        if new_color == pyray.BLACK:
+            new_color = pyray.WHITE
+    else:
+        if new_color == pyray.WHITE:
+            new_color = pyray.BLACK
+    return pyray.Color(new_color[0], new_color[1], new_color[2], new_color[3])
+
+
+class ThemePalette:
+    def __init__(self, night_mode: bool, colors: tuple[pyray.Color, ...] = ()) -> None:
+        self.themes: dict[bool, dict[tuple[int, ...], pyray.Color]] = {
+            True: {},
+            False: {},
+        }
+        self.night_mode = night_mode
+        self.active = self.themes[night_mode]
+        self.precompute(colors)
+
+    def precompute(self, colors: tuple[pyray.Color, ...]) -> None:
+        for night_mode, palette in self.themes.items():
+            for color in colors:
+                palette[tuple(color)] = theme_color(color, night_mode)
+
+    def select(self, night_mode: bool) -> None:
+        self.night_mode = night_mode
+        self.active = self.themes[night_mode]
+
+    def resolve(self, color: pyray.Color) -> pyray.Color:
+        key = tuple(color)
+        resolved = self.active.get(key)
+        if resolved is None:
+            resolved = self.active[key] = theme_color(color, self.night_mode)
+        return resolved
+
+
+class TextLayout:
+    def __init__(self) -> None:
+        self.widths: dict[tuple[str, int], int] = {}
+        self.positions: dict[tuple[str, int, float, float], tuple[int, int]] = {}
+
+    def measure(self, text: str, font_size: int) -> int:
+        key = (text, font_size)
+        width = self.widths.get(key)
+        if width is None:
+            width = self.widths[key] = pyray.measure_text(text, font_size)
+        return width
+
+    def centered(
+        self, text: str, font_size: int, center_x: float, y: float
+    ) -> tuple[int, int]:
+        key = (text, font_size, center_x, y)
+        position = self.positions.get(key)
+        if position is None:
+            position = self.positions[key] = (
+                int(center_x - (self.measure(text, font_size) / 2)),
+                int(y),
+            )
+        return position
+
+    def draw_centered(
+        self,
+        text: str,
+        font_size: int,
+        center_x: float,
+        y: float,
+        color: pyray.Color,
+    ) -> None:
+        x, y = self.centered(text, font_size, center_x, y)
+        pyray.draw_text(text, x, y, font_size, color)
@@ -0,0 +1,179 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import argparse
+import json
+import statistics
+from zerth_trial import Stimulus, TrialGenerator, TrialRecord
+from zerth_input import InputCapture, Response, active_bindings
+from zerth_record import event_to_trial, read_session_log
+from zerth_schedule import GRID_DURATION_NS
+
+
+@dataclass
+class ReplayResult:
+    path: str
+    trials_checked: int = 0
+    mismatched_trials: list[int] = field(default_factory=list)
+    mismatched_responses: int = 0
+    scores: dict[str, dict[str, float]] = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def is_consistent(self) -> bool:
+        return (
+            self.error is None
+            and not self.mismatched_trials
+            and not self.mismatched_responses
+        )
+
+
+def score_session(
+    trials: dict[int, TrialRecord], responses: list[Response], active: Stimulus
+) -> dict[str, dict[str, float]]:
+    scores = {}
+    for stimulus in active:
+        first_latency: dict[int, int] = {}
+        for response in responses:
+            if response.stimulus == stimulus:
+                first_latency.setdefault(response.trial_index, response.latency_ns)
+        matches = {
+            index for index, trial in trials.items() if stimulus in trial.replicates
+        }
+        responded = set(first_latency)
+        reaction_times = [first_latency[index] / 1e6 for index in matches & responded]
+        scores[stimulus.name] = {
+            "hits": len(matches & responded),
+            "misses": len(matches - responded),
+            "false_alarms": len(responded - matches),
+            "correct_rejections": len(trials) - len(matches | responded),
+            "mean_reaction_ms": statistics.fmean(reaction_times)
+            if reaction_times
+            else 0.0,
+            "median_reaction_ms": statistics.median(reaction_times)
+            if reaction_times
+            else 0.0,
+        }
+    return scores
+
+
+class SessionReplay:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.header: dict = {}
+        recorded_trials: list[dict] = []
+        self.recorded_responses: list[dict] = []
+        for event in read_session_log(path):
+            match event["type"]:
+                case "session":
+                    if self.header:
+                        raise ValueError(f"{path} contains more than one session")
+                    self.header = event
+                case "trial":
+                    recorded_trials.append(event)
+                case "response":
+                    self.recorded_responses.append(event)
+        if not self.header:
+            raise ValueError(f"{path} has no session header")
+        self.active = Stimulus(self.header["active"])
+        self.generator = TrialGenerator(
+            seed=self.header["seed"],
+            difficulty=self.header["difficulty"],
+            shape_active=Stimulus.SHAPE in self.active,
+            color_active=Stimulus.COLOR in self.active,
+            audio_active=Stimulus.AUDIO in self.active,
+            n_back=self.header["n_back"],
+        )
+        self.trials: dict[int, TrialRecord] = {}
+        self.mismatched_trials: list[int] = []
+        self.timeline: list[tuple[int, int, object]] = []
+        for event in recorded_trials:
+            while self.generator.trial_count <= event["index"]:
+                trial = self.generator.next_trial()
+            self.trials[event["index"]] = trial
+            if trial != event_to_trial(event):
+                self.mismatched_trials.append(event["index"])
+            self.timeline.append((event["onset_ns"], 0, (event["index"], trial)))
+        for event in self.recorded_responses:
+            self.timeline.append((event["timestamp_ns"], 1, event))
+        self.timeline.sort(key=lambda entry: (entry[0], entry[1]))
+        self.start_ns = self.timeline[0][0] if self.timeline else 0
+        self.end_ns = self.timeline[-1][0] + GRID_DURATION_NS if self.timeline else 0
+        self.cursor = 0
+
+    def capture(self) -> InputCapture:
+        return InputCapture(active_bindings(self.active), {}, lambda: 0)
+
+    def is_finished(self) -> bool:
+        return self.cursor >= len(self.timeline)
+
+    def advance(
+        self, elapsed_ns: float, capture: InputCapture
+    ) -> list[tuple[int, TrialRecord]]:
+        presented = []
+        while (
+            self.cursor < len(self.timeline)
+            and self.timeline[self.cursor][0] - self.start_ns <= elapsed_ns
+        ):
+            timestamp_ns, kind, payload = self.timeline[self.cursor]
+            self.cursor += 1
+            if kind == 0:
+                trial_index, trial = payload
+                capture.begin_trial(trial, trial_index, timestamp_ns)
+                presented.append(payload)
+            else:
+                capture.press(payload["key"], timestamp_ns)
+        return presented
+
+    def run(self) -> ReplayResult:
+        capture = self.capture()
+        self.cursor = 0
+        self.advance(float("inf"), capture)
+        mismatched_responses = sum(
+            recorded["is_hit"] != replayed.is_hit
+            or recorded["index"] != replayed.trial_index
+            for recorded, replayed in zip(self.recorded_responses, capture.responses)
+        ) + abs(len(self.recorded_responses) - len(capture.responses))
+        return ReplayResult(
+            self.path,
+            len(self.trials),
+            self.mismatched_trials,
+            mismatched_responses,
+            score_session(self.trials, capture.responses, self.active),
+        )
+
+
+def replay_session(path: str) -> ReplayResult:
+    return SessionReplay(path).run()
+
+
+def audit_session(path: str) -> ReplayResult:
+    try:
+        return replay_session(path)
+    except (OSError, ValueError) as error:
+        return ReplayResult(path, error=str(error))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded Zerthimous sessions")
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--jobs", type=int, default=1)
+    arguments = parser.parse_args()
+    with ProcessPoolExecutor(max_workers=arguments.jobs) as executor:
+        results = executor.map(audit_session, arguments.paths, chunksize=16)
+        inconsistent = 0
+        for result in results:
+            inconsistent += not result.is_consistent
+            print(
+                json.dumps(
+                    {
+                        "path": result.path,
+                        "trials": result.trials_checked,
+                        "consistent": result.is_consistent,
+                        "mismatched_trials": result.mismatched_trials,
+                        "mismatched_responses": result.mismatched_responses,
+                        "scores": result.scores,
+                        **({"error": result.error} if result.error else {}),
+                    }
+                )
+            )
+    raise SystemExit(1 if inconsistent else 0)
@@ -0,0 +1,66 @@
+from typing import Callable
+import time
+
+GRID_DURATION_NS = 3_000_000_000
+BLANK_DURATION_NS = 1_000_000_000
+
+
+class TrialScheduler:
+    def __init__(
+        self,
+        grid_duration_ns: int = GRID_DURATION_NS,
+        blank_duration_ns: int = BLANK_DURATION_NS,
+        clock: Callable[[], int] = time.perf_counter_ns,
+    ) -> None:
+        self.grid_duration_ns = grid_duration_ns
+        self.blank_duration_ns = blank_duration_ns
+        self.period_ns = grid_duration_ns + blank_duration_ns
+        self.clock = clock
+        self.start_ns = 0
+        self.trial_index = -1
+        self.presented_ns = 0
+        self.skipped = 0
+
+    def start(self, now_ns: int | None = None) -> None:
+        self.start_ns = self.clock() if now_ns is None else now_ns
+        self.trial_index = -1
+        self.presented_ns = 0
+        self.skipped = 0
+
+    def scheduled_onset(self, trial_index: int) -> int:
+        return self.start_ns + self.blank_duration_ns + (trial_index * self.period_ns)
+
+    def scheduled_offset(self, trial_index: int) -> int:
+        return self.scheduled_onset(trial_index) + self.grid_duration_ns
+
+    def due_index(self, now_ns: int) -> int:
+        return (now_ns - self.start_ns - self.blank_duration_ns) // self.period_ns
+
+    def update(self, now_ns: int | None = None) -> int:
+        now_ns = self.clock() if now_ns is None else now_ns
+        crossed = max(self.due_index(now_ns) - self.trial_index, 0)
+        if crossed:
+            self.trial_index += crossed
+            self.skipped += crossed - 1
+            if now_ns >= self.scheduled_offset(self.trial_index):
+                self.skipped += 1
+        return crossed
+
+    def is_visible(self, now_ns: int | None = None) -> bool:
+        now_ns = self.clock() if now_ns is None else now_ns
+        return (
+            self.trial_index >= 0 and now_ns < self.scheduled_offset(self.trial_index)
+        )
+
+    def next_deadline(self, now_ns: int | None = None) -> int:
+        now_ns = self.clock() if now_ns is None else now_ns
+        if self.is_visible(now_ns):
+            return self.scheduled_offset(self.trial_index)
+        return self.scheduled_onset(self.trial_index + 1)
+
+    def present(self, now_ns: int | None = None) -> int:
+        self.presented_ns = self.clock() if now_ns is None else now_ns
+        return self.presented_ns
+
+    def onset_error_ns(self) -> int:
+        return self.presented_ns - self.scheduled_onset(self.trial_index)
@@ -0,0 +1,467 @@
+from collections import deque
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import queue
+import random
+import socket
+import statistics
+import threading
+import time
+from typing import TextIO
+from zerth_trial import Stimulus, TrialGenerator, TrialRecord
+from zerth_input import active_bindings
+from zerth_record import trial_to_event
+from zerth_schedule import BLANK_DURATION_NS, GRID_DURATION_NS
+from zerth_session import Session
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+LEAD_NS = 500_000_000
+CLOCK_TOLERANCE_NS = 100_000_000
+MIN_DURATION_NS = 1_000_000
+MAX_N_BACK = 9
+
+
+class ProtocolError(ValueError):
+    pass
+
+
+def integer_field(
+    message: dict,
+    name: str,
+    default: int | None = None,
+    minimum: int = 0,
+    maximum: int | None = None,
+) -> int | None:
+    value = message.get(name, default)
+    if value is None and default is None:
+        return None
+    if (
+        isinstance(value, bool)
+        or not isinstance(value, int)
+        or value < minimum
+        or (maximum is not None and value > maximum)
+    ):
+        raise ProtocolError(f"invalid {name}: {value!r}")
+    return value
+
+
+def object_message(line: bytes) -> dict:
+    message = json.loads(line)
+    if not isinstance(message, dict):
+        raise ProtocolError("messages must be JSON objects")
+    return message
+
+
+def encode(event: dict) -> bytes:
+    return (json.dumps(event) + "\n").encode()
+
+
+def trial_descriptor(session: Session, trial_index: int, trial: TrialRecord) -> dict:
+    descriptor = trial_to_event(
+        trial_index, trial, session.scheduler.scheduled_onset(trial_index)
+    )
+    del descriptor["replicates"]
+    descriptor["offset_ns"] = session.scheduler.scheduled_offset(trial_index)
+    return descriptor
+
+
+def descriptor_to_trial(descriptor: dict) -> TrialRecord:
+    return TrialRecord(
+        descriptor["grid_mask"],
+        bytes.fromhex(descriptor["shape_codes"]),
+        bytes.fromhex(descriptor["color_codes"]),
+        descriptor["audio_key"],
+        Stimulus.NONE,
+    )
+
+
+class TrialLookahead:
+    def __init__(self, generator: TrialGenerator) -> None:
+        self.generator = generator
+        self.trials: deque[TrialRecord] = deque()
+        self.first_index = 0
+        self.consumed = 0
+        self.streamed = 0
+
+    def trial(self, trial_index: int) -> TrialRecord:
+        while self.first_index + len(self.trials) <= trial_index:
+            self.trials.append(self.generator.next_trial())
+        trial = self.trials[trial_index - self.first_index]
+        while self.first_index < min(self.consumed, self.streamed):
+            self.trials.popleft()
+            self.first_index += 1
+        return trial
+
+    def stream(self, trial_index: int) -> TrialRecord:
+        self.streamed = max(self.streamed, trial_index + 1)
+        return self.trial(trial_index)
+
+    def next_trial(self) -> TrialRecord:
+        self.consumed += 1
+        return self.trial(self.consumed - 1)
+
+
+class SessionServer:
+    def __init__(self, lead_ns: int = LEAD_NS) -> None:
+        self.lead_ns = lead_ns
+        self.sessions: dict[int, Session] = {}
+        self.session_ids = itertools.count()
+        self.completed = 0
+
+    def create_session(self, request: dict) -> tuple[Session, TrialLookahead]:
+        seed = request.get("seed")
+        if seed is not None and (
+            isinstance(seed, bool)
+            or not isinstance(seed, (int, float))
+            or not math.isfinite(seed)
+        ):
+            raise ProtocolError(f"invalid seed: {seed!r}")
+        active = Stimulus(
+            integer_field(request, "active", int(Stimulus.POSITION), 1, 15)
+        )
+        generator = TrialGenerator(
+            seed=seed,
+            difficulty=integer_field(request, "difficulty", 95, 0, 100),
+            shape_active=Stimulus.SHAPE in active,
+            color_active=Stimulus.COLOR in active,
+            audio_active=Stimulus.AUDIO in active,
+            n_back=integer_field(request, "n_back", 3, 1, MAX_N_BACK),
+        )
+        lookahead = TrialLookahead(generator)
+        session = Session(
+            generator,
+            active,
+            lookahead.next_trial,
+            grid_duration_ns=integer_field(
+                request, "grid_ns", GRID_DURATION_NS, MIN_DURATION_NS
+            ),
+            blank_duration_ns=integer_field(
+                request, "blank_ns", BLANK_DURATION_NS, MIN_DURATION_NS
+            ),
+        )
+        session.start(0)
+        return session, lookahead
+
+    async def stream_trials(
+        self,
+        session: Session,
+        lookahead: TrialLookahead,
+        trials: int | None,
+        started: float,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        indices = range(trials) if trials is not None else itertools.count()
+        for trial_index in indices:
+            send_at = session.scheduler.scheduled_onset(trial_index) - self.lead_ns
+            delay = started + (send_at / 1e9) - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            trial = lookahead.stream(trial_index)
+            writer.write(encode(trial_descriptor(session, trial_index, trial)))
+            await writer.drain()
+        if trials is not None:
+            end_ns = session.scheduler.scheduled_offset(trials - 1)
+            writer.write(encode({"type": "end", "end_ns": end_ns}))
+            await writer.drain()
+
+    def client_elapsed_ns(self, event: dict, now_ns: int) -> int:
+        elapsed_ns = event.get("elapsed_ns")
+        if isinstance(elapsed_ns, bool) or not isinstance(elapsed_ns, int):
+            raise ProtocolError("elapsed_ns must be an integer")
+        return min(elapsed_ns, now_ns + CLOCK_TOLERANCE_NS)
+
+    def receive(self, session: Session, event: dict, now_ns: int) -> dict | None:
+        match event.get("type"):
+            case "presented":
+                trial_index = integer_field(event, "index", -1)
+                elapsed_ns = self.client_elapsed_ns(event, now_ns)
+                session.step(elapsed_ns)
+                if session.capture.trial_index == trial_index:
+                    session.confirm_onset(elapsed_ns)
+            case "response":
+                key = event.get("key")
+                if not isinstance(key, str):
+                    raise ProtocolError(f"invalid key: {key!r}")
+                elapsed_ns = self.client_elapsed_ns(event, now_ns)
+                frame = session.step(elapsed_ns, [key])
+                if frame.responses:
+                    response = frame.responses[0]
+                    return {
+                        "type": "response",
+                        "index": response.trial_index,
+                        "stimulus": int(response.stimulus),
+                        "latency_ns": response.latency_ns,
+                        "is_hit": response.is_hit,
+                    }
+            case "stop":
+                return {"type": "score", "scores": session.score()}
+            case message_type:
+                raise ProtocolError(f"unknown message type {message_type!r}")
+        return None
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        session_id = next(self.session_ids)
+        streamer = None
+        try:
+            line = await reader.readline()
+            if not line:
+                return
+            request = object_message(line)
+            session, lookahead = self.create_session(request)
+            self.sessions[session_id] = session
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            writer.write(encode({"type": "session", **session.settings()}))
+            streamer = asyncio.create_task(
+                self.stream_trials(
+                    session,
+                    lookahead,
+                    integer_field(request, "trials", None, 1),
+                    started,
+                    writer,
+                )
+            )
+            async for line in reader:
+                event = object_message(line)
+                now_ns = int((loop.time() - started) * 1e9)
+                reply = self.receive(session, event, now_ns)
+                if reply is not None:
+                    writer.write(encode(reply))
+                    await writer.drain()
+                if event["type"] == "stop":
+                    self.completed += 1
+                    break
+        except ValueError as error:
+            writer.write(encode({"type": "error", "message": str(error)}))
+        except ConnectionError:
+            pass
+        finally:
+            if streamer is not None:
+                streamer.cancel()
+            self.sessions.pop(session_id, None)
+            writer.close()
+
+    async def serve(self, host: str, port: int) -> asyncio.Server:
+        return await asyncio.start_server(self.handle, host, port, backlog=1024)
+
+
+async def stand_in_client(
+    host: str,
+    port: int,
+    trials: int,
+    active: int = int(Stimulus.POSITION),
+    grid_ns: int = GRID_DURATION_NS,
+    blank_ns: int = BLANK_DURATION_NS,
+    press_rate: float = 0.3,
+    reaction_ms: float = 600.0,
+) -> dict:
+    loop = asyncio.get_running_loop()
+    reader, writer = await asyncio.open_connection(host, port)
+    player = random.Random()
+    keys = list(active_bindings(Stimulus(active)))
+    onset_lag_ns: list[int] = []
+    pending: set[asyncio.Task] = set()
+
+    async def present(descriptor: dict) -> None:
+        delay = started + (descriptor["onset_ns"] / 1e9) - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        elapsed_ns = int((loop.time() - started) * 1e9)
+        onset_lag_ns.append(elapsed_ns - descriptor["onset_ns"])
+        writer.write(
+            encode(
+                {
+                    "type": "presented",
+                    "index": descriptor["index"],
+                    "elapsed_ns": elapsed_ns,
+                }
+            )
+        )
+        pressed = [key for key in keys if player.random() < press_rate]
+        if pressed:
+            reaction_s = max(player.gauss(reaction_ms, reaction_ms / 4), 1) / 1e3
+            await asyncio.sleep(reaction_s)
+            elapsed_ns = int((loop.time() - started) * 1e9)
+            for key in pressed:
+                writer.write(
+                    encode({"type": "response", "key": key, "elapsed_ns": elapsed_ns})
+                )
+
+    writer.write(
+        encode(
+            {
+                "type": "start",
+                "active": active,
+                "trials": trials,
+                "grid_ns": grid_ns,
+                "blank_ns": blank_ns,
+            }
+        )
+    )
+    settings = json.loads(await reader.readline())
+    started = loop.time()
+    scores = {}
+    async for line in reader:
+        event = json.loads(line)
+        match event["type"]:
+            case "trial":
+                task = asyncio.create_task(present(event))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            case "end":
+                end_at = started + (event["end_ns"] / 1e9)
+                await asyncio.sleep(max(end_at - loop.time(), 0))
+                await asyncio.gather(*pending)
+                writer.write(encode({"type": "stop"}))
+            case "score":
+                scores = event["scores"]
+                break
+    writer.close()
+    return {"seed": settings["seed"], "onset_lag_ns": onset_lag_ns, "scores": scores}
+
+
+async def load_test(arguments: argparse.Namespace) -> dict:
+    server = None
+    if arguments.local:
+        server = await SessionServer().serve(arguments.host, arguments.port)
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(
+            stand_in_client(
+                arguments.host,
+                arguments.port,
+                arguments.trials,
+                arguments.active,
+                int(arguments.grid_ms * 1e6),
+                int(arguments.blank_ms * 1e6),
+            )
+            for _ in range(arguments.clients)
+        )
+    )
+    if server is not None:
+        server.close()
+        await server.wait_closed()
+    lags = sorted(lag for result in results for lag in result["onset_lag_ns"])
+    return {
+        "clients": len(results),
+        "completed": sum(bool(result["scores"]) for result in results),
+        "seconds": time.perf_counter() - start,
+        "onset_lag_p50_ms": statistics.median(lags) / 1e6 if lags else 0.0,
+        "onset_lag_max_ms": lags[-1] / 1e6 if lags else 0.0,
+    }
+
+
+class StationClient:
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        timeout: float = 5.0,
+    ) -> None:
+        self.address = (host, port)
+        self.timeout = timeout
+        self.connection: socket.socket | None = None
+        self.request: dict = {}
+        self.events: queue.SimpleQueue[dict] = queue.SimpleQueue()
+        self.settings: dict = {}
+        self.started_ns = 0
+        self.connected = threading.Event()
+        self.closing = threading.Event()
+        self.error: str | None = None
+        self.reader = threading.Thread(
+            target=self.run, name="StationClient", daemon=True
+        )
+
+    def send(self, event: dict) -> None:
+        if not self.connected.is_set():
+            return
+        try:
+            self.connection.sendall(encode(event))
+        except OSError:
+            pass
+
+    def start(self, **request) -> None:
+        self.request = request
+        self.reader.start()
+
+    def elapsed_ns(self, timestamp_ns: int | None = None) -> int:
+        if timestamp_ns is None:
+            timestamp_ns = time.perf_counter_ns()
+        return timestamp_ns - self.started_ns
+
+    def connect(self) -> TextIO:
+        self.connection = socket.create_connection(self.address, self.timeout)
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.connection.sendall(encode({"type": "start", **self.request}))
+        stream = self.connection.makefile("r", encoding="utf-8")
+        settings = json.loads(stream.readline())
+        if settings.get("type") == "error":
+            raise ValueError(settings.get("message"))
+        if settings.get("type") != "session":
+            raise ValueError(f"unexpected handshake {settings.get('type')!r}")
+        self.connection.settimeout(None)
+        self.settings = settings
+        self.started_ns = time.perf_counter_ns()
+        self.connected.set()
+        return stream
+
+    def run(self) -> None:
+        try:
+            for line in self.connect():
+                event = json.loads(line)
+                if event.get("type") == "error":
+                    raise ValueError(event.get("message"))
+                self.events.put(event)
+        except (OSError, ValueError) as error:
+            if not self.closing.is_set():
+                self.error = f"{self.address[0]}:{self.address[1]}: {error}"
+            return
+        if not self.closing.is_set():
+            self.error = "session server closed the connection"
+
+    def poll(self) -> list[dict]:
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def close(self) -> None:
+        self.closing.set()
+        self.send({"type": "stop"})
+        if self.connection is not None:
+            self.connection.close()
+
+
+async def serve_forever(host: str, port: int) -> None:
+    server = await SessionServer().serve(host, port)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Zerthimous session server")
+    parser.add_argument("mode", choices=("serve", "load"))
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--trials", type=int, default=10)
+    parser.add_argument("--active", type=int, default=int(Stimulus.POSITION))
+    parser.add_argument("--grid-ms", type=float, default=GRID_DURATION_NS / 1e6)
+    parser.add_argument("--blank-ms", type=float, default=BLANK_DURATION_NS / 1e6)
+    parser.add_argument(
+        "--local", action="store_true", help="host the server in the load test"
+    )
+    arguments = parser.parse_args()
+    if arguments.mode == "serve":
+        asyncio.run(serve_forever(arguments.host, arguments.port))
+    else:
+        print(json.dumps(asyncio.run(load_test(arguments))))
@@ -0,0 +1,171 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable, Iterable
+import argparse
+import json
+import random
+import time
+from zerth_trial import EMPTY_TRIAL, Stimulus, TrialGenerator, TrialRecord, new_seed
+from zerth_input import InputCapture, Response, active_bindings
+from zerth_replay import score_session
+from zerth_schedule import BLANK_DURATION_NS, GRID_DURATION_NS, TrialScheduler
+
+
+@dataclass(frozen=True, slots=True)
+class SessionFrame:
+    trial: TrialRecord
+    presented: tuple[int, TrialRecord] | None
+    responses: list[Response] = field(default_factory=list)
+
+
+class Session:
+    def __init__(
+        self,
+        generator: TrialGenerator,
+        active: Stimulus,
+        next_trial: Callable[[], TrialRecord] | None = None,
+        key_codes: dict[int, str] | None = None,
+        read_key: Callable[[], int] = lambda: 0,
+        grid_duration_ns: int = GRID_DURATION_NS,
+        blank_duration_ns: int = BLANK_DURATION_NS,
+        clock: Callable[[], int] = time.perf_counter_ns,
+    ) -> None:
+        self.generator = generator
+        self.active = active
+        self.next_trial = next_trial or generator.next_trial
+        self.scheduler = TrialScheduler(grid_duration_ns, blank_duration_ns, clock)
+        self.capture = InputCapture(
+            active_bindings(active), key_codes or {}, read_key, clock
+        )
+        self.current_trial = EMPTY_TRIAL
+        self.trials: dict[int, TrialRecord] = {}
+        self.started = False
+
+    @classmethod
+    def create(
+        cls,
+        seed: float | None = None,
+        difficulty: int = 95,
+        active: Stimulus = Stimulus.POSITION,
+        n_back: int = 3,
+        **options,
+    ) -> "Session":
+        generator = TrialGenerator(
+            seed=seed,
+            difficulty=difficulty,
+            shape_active=Stimulus.SHAPE in active,
+            color_active=Stimulus.COLOR in active,
+            audio_active=Stimulus.AUDIO in active,
+            n_back=n_back,
+        )
+        return cls(generator, active, **options)
+
+    def settings(self) -> dict:
+        return {
+            "seed": self.generator.seed,
+            "difficulty": self.generator.difficulty,
+            "active": int(self.active),
+            "n_back": self.generator.n_back,
+        }
+
+    def start(self, now_ns: int) -> None:
+        self.scheduler.start(now_ns)
+        self.started = True
+
+    def step(self, now_ns: int, inputs: Iterable[str] = ()) -> SessionFrame:
+        if not self.started:
+            self.start(now_ns)
+        presented = None
+        crossed = self.scheduler.update(now_ns)
+        if crossed:
+            for _ in range(crossed):
+                self.current_trial = self.next_trial()
+            trial_index = self.scheduler.trial_index
+            if self.scheduler.is_visible(now_ns):
+                self.trials[trial_index] = self.current_trial
+                self.capture.begin_trial(
+                    self.current_trial, trial_index, self.scheduler.present(now_ns)
+                )
+                presented = (trial_index, self.current_trial)
+            else:
+                self.current_trial = EMPTY_TRIAL
+                self.capture.begin_trial(EMPTY_TRIAL, -1, now_ns)
+        responses = []
+        for key in inputs:
+            response = self.capture.press(key, now_ns)
+            if response is not None:
+                responses.append(response)
+        if self.scheduler.is_visible(now_ns):
+            return SessionFrame(self.current_trial, presented, responses)
+        return SessionFrame(EMPTY_TRIAL, presented, responses)
+
+    def confirm_onset(self, onset_ns: int | None = None) -> None:
+        self.capture.onset_ns = self.scheduler.present(onset_ns)
+
+    def score(self) -> dict[str, dict[str, float]]:
+        return score_session(self.trials, self.capture.responses, self.active)
+
+
+def simulate_session(
+    seed: float,
+    difficulty: int = 95,
+    active: int = int(Stimulus.POSITION),
+    trials: int = 100,
+    accuracy: float = 0.8,
+    false_alarm_rate: float = 0.05,
+    reaction_ms: float = 600.0,
+) -> dict:
+    session = Session.create(seed, difficulty, Stimulus(active))
+    player = random.Random(seed)
+    keys = {stimulus: key for key, stimulus in session.capture.bindings.items()}
+    session.start(0)
+    for trial_index in range(trials):
+        onset_ns = session.scheduler.scheduled_onset(trial_index)
+        trial = session.step(onset_ns).trial
+        pressed = [
+            keys[stimulus]
+            for stimulus in session.active
+            if player.random()
+            < (accuracy if stimulus in trial.replicates else false_alarm_rate)
+        ]
+        if pressed:
+            reaction_ns = int(player.gauss(reaction_ms, reaction_ms / 4) * 1e6)
+            session.step(onset_ns + max(reaction_ns, 1), pressed)
+    return {
+        **session.settings(),
+        "trials": len(session.trials),
+        "scores": session.score(),
+    }
+
+
+def simulate_sessions(seeds: list[float], jobs: int = 1, **options) -> list[dict]:
+    if jobs <= 1:
+        return [simulate_session(seed, **options) for seed in seeds]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(
+            executor.map(
+                partial(simulate_session, **options),
+                seeds,
+                chunksize=max(len(seeds) // (jobs * 4), 1),
+            )
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate Zerthimous sessions")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--trials", type=int, default=100)
+    parser.add_argument("--difficulty", type=int, default=95)
+    parser.add_argument("--active", type=int, default=int(Stimulus.POSITION))
+    parser.add_argument("--jobs", type=int, default=1)
+    arguments = parser.parse_args()
+    seed_source = random.Random()
+    for result in simulate_sessions(
+        [new_seed(seed_source) for _ in range(arguments.sessions)],
+        arguments.jobs,
+        difficulty=arguments.difficulty,
+        active=arguments.active,
+        trials=arguments.trials,
+    ):
+        print(json.dumps(result))
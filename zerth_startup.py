@@ -0,0 +1,36 @@
+from typing import Callable
+import time
+
+
+class StartupTimeline:
+    def __init__(
+        self,
+        expected: tuple[str, ...],
+        clock: Callable[[], int] = time.perf_counter_ns,
+    ) -> None:
+        self.expected = expected
+        self.clock = clock
+        self.origin = clock()
+        self.marks: dict[str, int] = {}
+        self.reported = False
+
+    def mark(self, stage: str) -> int:
+        return self.marks.setdefault(stage, self.clock())
+
+    def has(self, stage: str) -> bool:
+        return stage in self.marks
+
+    def is_complete(self) -> bool:
+        return all(stage in self.marks for stage in self.expected)
+
+    def report(self) -> dict[str, float]:
+        return {
+            stage: (timestamp - self.origin) / 1e6
+            for stage, timestamp in sorted(self.marks.items(), key=lambda x: x[1])
+        }
+
+    def format(self) -> str:
+        return "startup: " + ", ".join(
+            f"{stage} {elapsed_ms:.1f} ms"
+            for stage, elapsed_ms in self.report().items()
+        )
@@ -0,0 +1,281 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import accumulate
+from enum import IntFlag
+from typing import Iterator, TypeVar, Generic
+import math
+import random
+import string
+
+GRID_SIZE = 6
+
+SHAPES = ["Square", "Circle", "Square_Lines", "Circle_Lines"]
+COLOR_COUNT = 3
+
+
+def map_ranges(a: float, b: float, c: float, d: float, n: float) -> float:
+    return c + ((n - a) / (b - a)) * (d - c)
+
+
+def new_seed(source: random.Random | None = None) -> float:
+    source = source or random
+    return source.random() * (10 ** source.randint(0, 6))
+
+
+T = TypeVar("T")
+
+
+class StaticQueue(Generic[T]):
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.slots: list[T | None] = [None] * capacity
+        self.head = 0
+        self.size = 0
+
+    @property
+    def is_full(self) -> bool:
+        return self.size == self.capacity
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, index: int) -> T:
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("StaticQueue index out of range")
+        return self.slots[(self.head + index) % self.capacity]
+
+    def __iter__(self):
+        for index in range(self.size):
+            yield self.slots[(self.head + index) % self.capacity]
+
+    def enqueue(self, item: T) -> T:
+        if self.size == self.capacity:
+            self.slots[self.head] = item
+            self.head = (self.head + 1) % self.capacity
+            return item
+        self.slots[(self.head + self.size) % self.capacity] = item
+        self.size += 1
+        return item
+
+    def clear(self):
+        self.slots = [None] * self.capacity
+        self.head = 0
+        self.size = 0
+
+
+class RandomWithPity:
+    def __init__(self, percentage: int, pity: int, seed: float | None = None) -> None:
+        self.seed = new_seed() if seed is None else seed
+        self.generator = random.Random(self.seed)
+        self.roll_count = 0
+        self.pity_count = 1
+        self.percentage = percentage
+        self.pity = pity or math.inf
+
+    def roll(self) -> bool:
+        self.roll_count += 1
+        draw = self.generator.random()
+        if self.pity_count % self.pity == 0:
+            self.pity_count = 1
+            return True
+        spin = draw < (self.percentage / 100)
+        if spin:
+            self.pity_count = 1
+        else:
+            self.pity_count += 1
+        return spin
+
+    def reset_seed(self):
+        self.seed = new_seed()
+        self.generator = random.Random(self.seed)
+        self.roll_count = 0
+        self.pity_count = 1
+
+
+class Stimulus(IntFlag):
+    NONE = 0
+    POSITION = 1
+    SHAPE = 2
+    COLOR = 4
+    AUDIO = 8
+
+
+@dataclass(frozen=True, slots=True)
+class TrialRecord:
+    grid_mask: int
+    shape_codes: bytes
+    color_codes: bytes
+    audio_key: str
+    replicates: Stimulus = Stimulus.NONE
+
+    def cell_count(self) -> int:
+        return self.grid_mask.bit_count()
+
+    def cells(self) -> Iterator[tuple[int, int]]:
+        mask = self.grid_mask
+        while mask:
+            low_bit = mask & -mask
+            yield divmod(low_bit.bit_length() - 1, GRID_SIZE)
+            mask ^= low_bit
+
+
+EMPTY_TRIAL = TrialRecord(0, b"", b"", "")
+
+ROW_LAYOUTS = tuple(
+    tuple(mask for mask in range(1 << GRID_SIZE) if mask.bit_count() == count)
+    for count in range(GRID_SIZE + 1)
+)
+
+
+def admissible_cell_counts(
+    squares_left: int, max_cells_per_row: float, i: int
+) -> list[int]:
+    return [
+        choice
+        for choice in range(min(math.ceil(max_cells_per_row) + 1, 6) + 1)
+        if (squares_left - choice) / (6 - (i + 1)) <= max_cells_per_row
+    ]
+
+
+@lru_cache(maxsize=None)
+def row_compositions(
+    number_of_squares: int,
+) -> tuple[tuple[tuple[int, ...], ...], tuple[float, ...]]:
+    max_cells_per_row = number_of_squares / 6
+    weights: dict[tuple[int, ...], float] = {}
+
+    def walk(organization: tuple[int, ...], squares_left: int, weight: float):
+        i = len(organization)
+        if i == 5:
+            composition = organization + (squares_left,)
+            weights[composition] = weights.get(composition, 0.0) + weight
+            return
+        choices = admissible_cell_counts(squares_left, max_cells_per_row, i)
+        for cell_count in choices:
+            if squares_left - cell_count < 0:
+                walk(organization + (squares_left,), 0, weight / len(choices))
+            else:
+                walk(
+                    organization + (cell_count,),
+                    squares_left - cell_count,
+                    weight / len(choices),
+                )
+
+    walk((), number_of_squares, 1.0)
+    return tuple(weights), tuple(weights.values())
+
+
+@lru_cache(maxsize=None)
+def row_composition_cumulative(number_of_squares: int) -> tuple[float, ...]:
+    return tuple(accumulate(row_compositions(number_of_squares)[1]))
+
+
+def sample_row_composition(
+    number_of_squares: int, generator: random.Random | None = None
+) -> list[int]:
+    generator = generator or random
+    compositions = row_compositions(number_of_squares)[0]
+    cumulative = row_composition_cumulative(number_of_squares)
+    return list(generator.choices(compositions, cum_weights=cumulative)[0])
+
+
+class TrialGenerator:
+    def __init__(
+        self,
+        seed: float | None = None,
+        difficulty: int = 95,
+        shape_active: bool = False,
+        color_active: bool = False,
+        audio_active: bool = False,
+        n_back: int = 3,
+    ) -> None:
+        self.seed = new_seed() if seed is None else seed
+        self.difficulty = min(max(difficulty, 0), 100)
+        self.shape_active = shape_active
+        self.color_active = color_active
+        self.audio_active = audio_active
+        self.n_back = n_back
+        self.generator = random.Random(self.seed)
+        self.random_position_object = RandomWithPity(33, 5, new_seed(self.generator))
+        self.random_shape_object = RandomWithPity(33, 3, new_seed(self.generator))
+        self.random_color_object = RandomWithPity(33, 5, new_seed(self.generator))
+        self.random_audio_object = RandomWithPity(15, 6, new_seed(self.generator))
+        self.trial_cache = StaticQueue[TrialRecord](n_back)
+        self.was_previous_position = False
+        self.trial_count = 0
+
+    def generate_grid_mask(self) -> int:
+        number_of_squares = int(
+            map_ranges(0, 100, 4, 12, self.difficulty)
+        ) - self.generator.randint(0, 2)
+        organization = sample_row_composition(number_of_squares, self.generator)
+        self.generator.shuffle(organization)
+        grid_mask = 0
+        for i, row in enumerate(organization):
+            if row > 0:
+                row_layout = self.generator.choice(ROW_LAYOUTS[min(row, GRID_SIZE)])
+                grid_mask |= row_layout << (i * GRID_SIZE)
+        return grid_mask
+
+    def generate_codes(self, count: int, option_count: int) -> bytes:
+        codes = []
+        for i in range(option_count):
+            codes = codes + [i] * math.floor(count / option_count)
+        remainder = count - len(codes)
+        if remainder > 0:
+            for i in range(remainder):
+                codes.append(self.generator.randrange(option_count))
+        self.generator.shuffle(codes)
+        return bytes(codes)
+
+    def next_trial(self) -> TrialRecord:
+        replicates = Stimulus.NONE
+        n_back_trial = self.trial_cache[0] if self.trial_cache.is_full else None
+        if n_back_trial is not None and not self.was_previous_position:
+            if self.random_position_object.roll():
+                replicates |= Stimulus.POSITION
+                if self.shape_active and self.random_shape_object.roll():
+                    replicates |= Stimulus.SHAPE
+                if self.color_active and self.random_color_object.roll():
+                    replicates |= Stimulus.COLOR
+        if replicates & Stimulus.POSITION:
+            grid_mask = n_back_trial.grid_mask
+        else:
+            grid_mask = self.generate_grid_mask()
+        actual_number_of_squares = grid_mask.bit_count()
+        if replicates & Stimulus.SHAPE:
+            shape_codes = n_back_trial.shape_codes
+        elif self.shape_active:
+            shape_codes = self.generate_codes(actual_number_of_squares, len(SHAPES))
+        else:
+            shape_codes = bytes(actual_number_of_squares)
+        if replicates & Stimulus.COLOR:
+            color_codes = n_back_trial.color_codes
+        elif self.color_active:
+            color_codes = self.generate_codes(actual_number_of_squares, COLOR_COUNT)
+        else:
+            color_codes = bytes(actual_number_of_squares)
+        audio_key = ""
+        if self.audio_active:
+            is_replicate_audio = self.random_audio_object.roll()
+            if (
+                is_replicate_audio
+                and n_back_trial is not None
+                and n_back_trial.audio_key
+            ):
+                audio_key = n_back_trial.audio_key
+                replicates |= Stimulus.AUDIO
+            else:
+                audio_key = self.generator.choice(string.ascii_lowercase)
+        self.was_previous_position = (
+            not self.was_previous_position and bool(replicates & Stimulus.POSITION)
+        )
+        self.trial_count += 1
+        return self.trial_cache.enqueue(
+            TrialRecord(grid_mask, shape_codes, color_codes, audio_key, replicates)
+        )
+
+    def generate(self, n: int) -> list[TrialRecord]:
+        return [self.next_trial() for _ in range(n)]